@@ -6,6 +6,7 @@ from app.api.endpoints import (
     languages,
     phonology,
     sc,
+    status,
     users,
     word_classes,
     word_links,
@@ -26,3 +27,4 @@ api_router.include_router(
 api_router.include_router(
     grammar_tables.router, prefix="/grammar_tables", tags=["grammar_tables"]
 )
+api_router.include_router(status.router, prefix="/status", tags=["status"])
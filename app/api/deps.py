@@ -2,16 +2,20 @@ import time
 from collections.abc import AsyncGenerator
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.api.middleware import LAST_WRITE_COOKIE, LAST_WRITE_HEADER
 from app.core import config, security
-from app.core.session import async_session
+from app.core.session import async_session, read_session
 from app.models import User
+from app.utils.cache import LRUCache
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl="auth/access-token")
+optional_oauth2 = OAuth2PasswordBearer(tokenUrl="auth/access-token", auto_error=False)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -19,9 +23,20 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
-async def get_current_user(
-    session: AsyncSession = Depends(get_session), token: str = Depends(reusable_oauth2)
-) -> User:
+# (user id, token) -> the user's columns, so most requests skip loading the user.
+# Invalidation only reaches this process, other workers see changes within the TTL.
+_users = LRUCache(
+    max_weight=config.settings.AUTH_USER_CACHE_SIZE,
+    ttl=config.settings.AUTH_USER_CACHE_TTL,
+)
+
+
+def invalidate_user(user_id: str):
+    """Forget the cached user for every token, after a password change or delete."""
+    _users.discard_where(lambda x: x[0] == str(user_id))
+
+
+def _decode_access_token(token: str) -> security.JWTTokenPayload:
     try:
         payload = jwt.decode(
             token, config.settings.SECRET_KEY, algorithms=[security.JWT_ALGORITHM]
@@ -45,10 +60,68 @@ async def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials, token expired or not yet valid",
         )
+    return token_data
+
+
+async def get_current_user_id(token: str = Depends(reusable_oauth2)) -> str:
+    """The user id from the token alone, for endpoints that don't need the user.
+
+    This doesn't check the user still exists, so only use it where a deleted
+    user can't do anything anyway.
+    """
+    return str(_decode_access_token(token).sub)
+
+
+async def get_read_session(
+    request: Request, token: str | None = Depends(optional_oauth2)
+) -> AsyncGenerator[AsyncSession, None]:
+    """A session for endpoints that only read, on a replica if there are any.
+
+    The last write time clients send back and the token are only used to keep
+    those who just wrote something on the primary, endpoints still need their
+    own authentication.
+    """
+    user_id = None
+    if token is not None:
+        try:
+            user_id = str(_decode_access_token(token).sub)
+        except HTTPException:
+            pass
+
+    last_write = None
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(
+        LAST_WRITE_COOKIE
+    )
+    if value is not None:
+        try:
+            last_write = float(value)
+        except ValueError:
+            pass
+
+    async with read_session(user_id, last_write) as session:
+        yield session
+
+
+async def get_current_user(
+    session: AsyncSession = Depends(get_session), token: str = Depends(reusable_oauth2)
+) -> User:
+    token_data = _decode_access_token(token)
+    key = (str(token_data.sub), token)
+    # so the session can tell whose changes it commits
+    session.info["user_id"] = key[0]
+
+    cached = _users.get(key)
+    if cached is not None:
+        # a fresh instance for this session, without going to the database
+        user = User(**cached)
+        make_transient_to_detached(user)
+        session.add(user)
+        return user
 
     result = await session.execute(select(User).where(User.id == token_data.sub))
     user = result.scalars().first()
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
+    _users.set(key, {x.key: getattr(user, x.key) for x in inspect(User).column_attrs})
     return user
@@ -31,7 +31,15 @@ async def login_access_token(
     if user is None:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
 
-    if not security.verify_password(form_data.password, user.hashed_password):
+    try:
+        verified = await security.verify_password_async(
+            form_data.password, user.hashed_password
+        )
+    except security.PasswordHashingBusy as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+    if not verified:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
 
     return security.generate_access_token_response(str(user.id))
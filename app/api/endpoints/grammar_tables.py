@@ -26,7 +26,7 @@ router = APIRouter()
 async def get_grammar_tables_by_language(
     language_id: int,
     current_user: User = Depends(deps.get_current_user),
-    session: AsyncSession = Depends(deps.get_session),
+    session: AsyncSession = Depends(deps.get_read_session),
 ):
     tables = (
         (
@@ -55,7 +55,11 @@ async def upsert_grammar_tables(
     found_ids = {x.id for x in grammar_tables if x.id is not None}
 
     await verify_ownership(
-        session, current_user=current_user, schema=GrammarTable, target_ids=found_ids
+        session,
+        current_user=current_user,
+        schema=GrammarTable,
+        target_ids=found_ids,
+        language_ids=[x.language_id for x in grammar_tables],
     )
 
     upserted = []
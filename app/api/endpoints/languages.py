@@ -3,9 +3,11 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.core import lexicon_stats
 from app.models import Language, User
 from app.schemas.requests import LanguageRequest
-from app.schemas.responses import LanguageResponse
+from app.schemas.responses import LanguageResponse, LanguageStatsResponse
+from app.utils.db_utils import verify_language_ownership
 
 router = APIRouter()
 
@@ -28,10 +30,23 @@ async def upsert_language(
 @router.get("/", response_model=list[LanguageResponse])
 async def get_all_languages(
     current_user: User = Depends(deps.get_current_user),
-    session: AsyncSession = Depends(deps.get_session),
+    session: AsyncSession = Depends(deps.get_read_session),
 ):
     result = await session.execute(
         select(Language).where(Language.user_id == current_user.id)
     )
     langs = result.scalars().all()
     return langs
+
+
+@router.get("/{language_id}/stats", response_model=LanguageStatsResponse)
+async def get_language_stats(
+    language_id: int,
+    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Word counts by part of speech and word class, and link coverage."""
+    await verify_language_ownership(
+        session, current_user=current_user, language_id=language_id
+    )
+    return await lexicon_stats.get_language_stats(session, language_id)
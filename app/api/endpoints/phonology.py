@@ -1,13 +1,13 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.api import deps
 from app.models import Language, Phone, User
-from app.schemas.requests import PhonologyRequest
-from app.schemas.responses import PhoneResponse
-from app.utils.db_utils import verify_ownership
+from app.schemas.requests import PhoneBulkDeleteRequest, PhonologyRequest
+from app.schemas.responses import BulkDeleteResponse, PhoneResponse
+from app.utils.db_utils import verify_language_ownership, verify_ownership
 
 router = APIRouter()
 
@@ -29,6 +29,7 @@ async def upsert_phones(
         current_user=current_user,
         schema=Phone,
         target_ids=[x.id for x in phones],
+        language_ids=[x.language_id for x in phones],
     )
 
     if mode == "insert":
@@ -64,7 +65,7 @@ async def upsert_phones(
 async def get_language_phones(
     language_id: int,
     # current_user: User = Depends(deps.get_current_user),
-    session: AsyncSession = Depends(deps.get_session),
+    session: AsyncSession = Depends(deps.get_read_session),
 ):
     phones = (
         await session.scalars(select(Phone).where(Phone.language_id == language_id))
@@ -72,6 +73,37 @@ async def get_language_phones(
     return phones
 
 
+@router.post("/bulk_delete", response_model=BulkDeleteResponse)
+async def bulk_delete_phones(
+    filters: PhoneBulkDeleteRequest,
+    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Delete every phone of a language matching all the filters given, in one
+    statement. Ids from other languages are ignored."""
+    conditions = []
+    if filters.ids is not None:
+        conditions.append(Phone.id.in_(filters.ids))
+    if filters.vowel is not None:
+        conditions.append(Phone.vowel == filters.vowel)
+    if filters.quality is not None:
+        conditions.append(Phone.quality == filters.quality)
+    if not conditions:
+        raise HTTPException(400, detail="No filters given")
+
+    await verify_language_ownership(
+        session, current_user=current_user, language_id=filters.language_id
+    )
+    deleted = await session.scalars(
+        delete(Phone)
+        .where(Phone.language_id == filters.language_id, *conditions)
+        .returning(Phone.id)
+    )
+    output = {"deleted": sorted(deleted.all())}
+    await session.commit()
+    return output
+
+
 @router.delete("/{phone_id}", status_code=204)
 async def delete_phone(
     phone_id: int,
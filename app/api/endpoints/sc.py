@@ -1,69 +1,311 @@
-import os
+import asyncio
+import json
 import re
-import subprocess
+import uuid
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models import Language, SoundChangeRules, User, Word
-from app.schemas.requests import SCInput, SoundChangeRulesRequest
-from app.schemas.responses import SCOutput, SoundChangeRulesResponse
+from app.core import config, jobs
+from app.core.sca import (
+    LexurgyBusyError,
+    LexurgyError,
+    LexurgyRulesError,
+    LexurgyTimeoutError,
+    Ruleset,
+    apply_ruleset,
+    get_ruleset,
+    invalidate_ruleset,
+)
+from app.models import (
+    GrammarTable,
+    GrammarTableCell,
+    Language,
+    SCJob,
+    SoundChangeRules,
+    User,
+    Word,
+)
+from app.schemas.requests import ParadigmRequest, SCInput, SoundChangeRulesRequest
+from app.schemas.responses import SCJobResponse, SCOutput, SoundChangeRulesResponse
 from app.utils.db_utils import verify_ownership
 
 router = APIRouter()
 
 
+async def _resolve_word_lists(
+    session: AsyncSession, word_lists: list[list[str]]
+) -> list[list[str]]:
+    """Turn each word list into words, looking up ids if given ids.
+
+    Ids from the whole batch are resolved in a single query for just the
+    `word` column, then put back in the order they were asked for.
+    """
+    id_lists: list[list[int] | None] = []
+    for word_list in word_lists:
+        ids_to_query = [int(y) for y in word_list if re.match(r"^\d+$", y) is not None]
+        if len(ids_to_query) > 0:
+            if len(ids_to_query) != len(word_list):
+                raise HTTPException(400, detail="Only words or ids, not both")
+            id_lists.append(ids_to_query)
+        else:
+            id_lists.append(None)
+
+    all_ids = {id for ids in id_lists if ids is not None for id in ids}
+    words_by_id = {}
+    if all_ids:
+        result = await session.execute(
+            select(Word.id, Word.word).where(Word.id.in_(all_ids))
+        )
+        words_by_id = dict(result.tuples().all())
+        missing_ids = sorted(all_ids - words_by_id.keys())
+        if missing_ids:
+            raise HTTPException(
+                404,
+                detail=f"Words not found: {', '.join(str(x) for x in missing_ids)}",
+            )
+
+    return [
+        word_list if ids is None else [words_by_id[id] for id in ids]
+        for word_list, ids in zip(word_lists, id_lists)
+    ]
+
+
+async def _load_rulesets(
+    session: AsyncSession, input: list[SCInput]
+) -> dict[int, Ruleset]:
+    rulesets = {}
+    for x in input:
+        if x.sound_changes_id in rulesets:
+            continue
+        ruleset = await get_ruleset(session, x.sound_changes_id)
+        if ruleset is None:
+            raise HTTPException(404, detail="Sound changes not found")
+        rulesets[x.sound_changes_id] = ruleset
+    return rulesets
+
+
 @router.post("/apply", response_model=SCOutput)
 async def sca(
     input: list[SCInput],
     current_user: User = Depends(deps.get_current_user),
     session: AsyncSession = Depends(deps.get_session),
 ):
-    output = []
-    for x in input:
-        word_list = open("input.wli", "w")
+    word_lists = await _resolve_word_lists(session, [x.word_list for x in input])
+    rulesets = await _load_rulesets(session, input)
 
-        ids_to_query = [
-            int(y) for y in x.word_list if re.match(r"^\d+$", y) is not None
-        ]
-        if len(ids_to_query) > 0:
-            if len(ids_to_query) != len(x.word_list):
-                raise HTTPException(400, detail="Only words or ids, not both")
-            stmnt = select(Word).where(Word.id.in_(ids_to_query))
-            result = (await session.scalars(stmnt)).unique().all()
-            word_list.write("\n".join(word.word for word in result))
-        else:
-            word_list.write("\n".join(x.word_list))
-        word_list.close()
+    # one engine call per distinct ruleset, however many inputs share it
+    inputs_by_ruleset: dict[int, list[int]] = {}
+    for i, x in enumerate(input):
+        inputs_by_ruleset.setdefault(x.sound_changes_id, []).append(i)
 
-        sound_change_rules = (
-            await session.scalars(
-                select(SoundChangeRules).where(
-                    SoundChangeRules.id == x.sound_changes_id
+    try:
+        evolved = await asyncio.gather(
+            *[
+                apply_ruleset(
+                    rulesets[ruleset_id],
+                    [word for i in indexes for word in word_lists[i]],
                 )
-            )
-        ).first()
-        sc_file = open("sc.lsc", "w")
-        sc_file.write(sound_change_rules.content)
-        sc_file.close()
-
-        path = os.getcwd()
-        with subprocess.Popen(
-            [f"{path}/app/core/lexurgy/bin/lexurgy", "sc", "sc.lsc", "input.wli"],
-            stdout=subprocess.PIPE,
-            bufsize=1,
-            universal_newlines=True,
-        ) as p:
-            for line in p.stdout:
-                if "Wrote the final forms" in line:
-                    p.terminate()
-
-        out_file = open("input_ev.wli")
-        output.extend(out_file.read().splitlines())
-        out_file.close()
-    return {"output": output}
+                for ruleset_id, indexes in inputs_by_ruleset.items()
+            ]
+        )
+    except LexurgyBusyError as e:
+        raise HTTPException(503, detail=str(e))
+    except LexurgyRulesError as e:
+        raise HTTPException(400, detail=str(e))
+    except LexurgyTimeoutError as e:
+        raise HTTPException(504, detail=str(e))
+    except LexurgyError as e:
+        raise HTTPException(502, detail=str(e))
+
+    outputs: list[list[str]] = [[] for _ in input]
+    for indexes, forms in zip(inputs_by_ruleset.values(), evolved):
+        start = 0
+        for i in indexes:
+            end = start + len(word_lists[i])
+            outputs[i] = forms[start:end]
+            start = end
+
+    return {
+        "output": [word for forms in outputs for word in forms],
+        "results": [
+            {"sound_changes_id": x.sound_changes_id, "input": words, "output": forms}
+            for x, words, forms in zip(input, word_lists, outputs)
+        ],
+    }
+
+
+@router.post("/apply/stream")
+async def sca_stream(
+    input: list[SCInput],
+    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Same as `/apply`, but streams NDJSON, one line per evolved word:
+
+    `{"input_index", "sound_changes_id", "input", "output", "done", "total"}`
+
+    Words are evolved `SCA_STREAM_CHUNK_SIZE` at a time and each chunk is sent
+    as soon as it is done. If the engine fails partway through, the last line
+    is `{"error": ...}` instead.
+    """
+    word_lists = await _resolve_word_lists(session, [x.word_list for x in input])
+    rulesets = await _load_rulesets(session, input)
+    total = sum(len(words) for words in word_lists)
+    chunk_size = config.settings.SCA_STREAM_CHUNK_SIZE
+
+    async def evolve():
+        done = 0
+        for i, (x, words) in enumerate(zip(input, word_lists)):
+            for start in range(0, len(words), chunk_size):
+                chunk = words[start : start + chunk_size]
+                try:
+                    forms = await apply_ruleset(rulesets[x.sound_changes_id], chunk)
+                except LexurgyError as e:
+                    yield json.dumps({"error": str(e)}) + "\n"
+                    return
+
+                lines = []
+                for word, form in zip(chunk, forms):
+                    done += 1
+                    lines.append(
+                        json.dumps(
+                            {
+                                "input_index": i,
+                                "sound_changes_id": x.sound_changes_id,
+                                "input": word,
+                                "output": form,
+                                "done": done,
+                                "total": total,
+                            }
+                        )
+                    )
+                yield "\n".join(lines) + "\n"
+
+    return StreamingResponse(evolve(), media_type="application/x-ndjson")
+
+
+async def _submit_job(
+    session: AsyncSession, current_user: User, kind: str, payload, total: int
+) -> SCJob:
+    job = await jobs.submit_job(
+        session, user_id=current_user.id, kind=kind, payload=payload, total=total
+    )
+    if job is None:
+        raise HTTPException(429, detail="Too many sound change jobs in progress")
+    return job
+
+
+async def _get_job(session: AsyncSession, user_id: str, job_id: uuid.UUID) -> SCJob:
+    job = await session.get(SCJob, str(job_id))
+    if job is None or job.user_id != user_id:
+        raise HTTPException(404, detail="Job not found")
+    return job
+
+
+@router.post("/jobs/apply", response_model=SCJobResponse)
+async def submit_sca_job(
+    input: list[SCInput],
+    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Queue the same work as `/apply` to run in the background."""
+    word_lists = await _resolve_word_lists(session, [x.word_list for x in input])
+    await _load_rulesets(session, input)
+
+    payload = [
+        {"sound_changes_id": x.sound_changes_id, "word_list": words}
+        for x, words in zip(input, word_lists)
+    ]
+    total = sum(len(words) for words in word_lists)
+    return await _submit_job(session, current_user, "apply", payload, total)
+
+
+@router.post("/jobs/paradigm", response_model=SCJobResponse)
+async def submit_paradigm_job(
+    input: ParadigmRequest,
+    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Queue inflecting every word with every cell of a grammar table."""
+    table = await session.get(GrammarTable, input.grammar_table_id)
+    if table is None:
+        raise HTTPException(404, detail="Grammar table not found")
+    await verify_ownership(
+        session, current_user=current_user, schema=GrammarTable, target_ids=[table.id]
+    )
+
+    [word_list] = await _resolve_word_lists(session, [input.word_list])
+    cell_count = await session.scalar(
+        select(func.count())
+        .select_from(GrammarTableCell)
+        .where(GrammarTableCell.grammar_table_id == table.id)
+    )
+
+    payload = {"grammar_table_id": table.id, "word_list": word_list}
+    total = len(word_list) * cell_count
+    return await _submit_job(session, current_user, "paradigm", payload, total)
+
+
+@router.get("/jobs/{job_id}", response_model=SCJobResponse)
+async def read_job(
+    job_id: uuid.UUID,
+    user_id: str = Depends(deps.get_current_user_id),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    return await _get_job(session, user_id, job_id)
+
+
+@router.get("/jobs/{job_id}/result")
+async def read_job_result(
+    job_id: uuid.UUID,
+    user_id: str = Depends(deps.get_current_user_id),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """The job's output, shaped like `/apply`'s for apply jobs and as
+    `{"input", "cells": [{"cell_id", "row_categories", "column_categories",
+    "output"}]}` for paradigm jobs."""
+    job = await _get_job(session, user_id, job_id)
+    if job.status == "failed":
+        raise HTTPException(400, detail=job.error)
+    if job.status != "done":
+        raise HTTPException(409, detail="Job is not done yet")
+    return json.loads(job.result)
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(
+    job_id: uuid.UUID,
+    user_id: str = Depends(deps.get_current_user_id),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Streams the job's progress as NDJSON, a `{"status", "done", "total",
+    "error"}` line whenever it changes, until the job is done or has failed."""
+    job = await _get_job(session, user_id, job_id)
+
+    async def progress():
+        last = None
+        while True:
+            await session.refresh(job)
+            # don't hold a transaction open between polls
+            await session.commit()
+            line = {
+                "status": job.status,
+                "done": job.done,
+                "total": job.total,
+                "error": job.error,
+            }
+            if line != last:
+                yield json.dumps(line) + "\n"
+                last = line
+            if job.status not in jobs.ACTIVE_STATUSES:
+                return
+            await asyncio.sleep(config.settings.SCA_JOB_POLL_INTERVAL)
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
 
 
 @router.post("/", response_model=list[SoundChangeRulesResponse])
@@ -77,6 +319,7 @@ async def upsert_sound_changes(
         current_user=current_user,
         schema=SoundChangeRules,
         target_ids=[x.id for x in sound_change_rules if x.id is not None],
+        language_ids=[x.language_id for x in sound_change_rules],
     )
 
     upserted = []
@@ -84,6 +327,9 @@ async def upsert_sound_changes(
         new = await session.merge(SoundChangeRules(**ruleset.model_dump()))
         upserted.append(new)
     await session.commit()
+
+    for ruleset in upserted:
+        invalidate_ruleset(ruleset.id)
     return upserted
 
 
@@ -91,7 +337,7 @@ async def upsert_sound_changes(
 async def read_sound_changes(
     role: str | None = None,
     current_user: User = Depends(deps.get_current_user),
-    session: AsyncSession = Depends(deps.get_session),
+    session: AsyncSession = Depends(deps.get_read_session),
 ):
     stmnt = select(SoundChangeRules)
     if role:
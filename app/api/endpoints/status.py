@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.core import security
+from app.core.session import async_engine
+from app.schemas.responses import StatusResponse
+
+router = APIRouter()
+
+
+@router.get("/", response_model=StatusResponse)
+async def read_status(user_id: str = Depends(deps.get_current_user_id)):
+    """This process's database pool and password hashing counters, each uvicorn
+    worker has its own."""
+    return {
+        "database_pool": async_engine.pool.stats(),
+        "password_hashing": security.hashing.stats(),
+    }
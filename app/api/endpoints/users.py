@@ -3,7 +3,7 @@ from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.core.security import get_password_hash
+from app.core.security import PasswordHashingBusy, get_password_hash_async
 from app.models import User
 from app.schemas.requests import UserCreateRequest, UserUpdatePasswordRequest
 from app.schemas.responses import UserResponse
@@ -11,6 +11,13 @@ from app.schemas.responses import UserResponse
 router = APIRouter()
 
 
+async def _hash_password(password: str) -> str:
+    try:
+        return await get_password_hash_async(password)
+    except PasswordHashingBusy as e:
+        raise HTTPException(503, detail=str(e), headers={"Retry-After": "1"})
+
+
 @router.get("/me", response_model=UserResponse)
 async def read_current_user(
     current_user: User = Depends(deps.get_current_user),
@@ -27,6 +34,7 @@ async def delete_current_user(
     """Delete current user"""
     await session.execute(delete(User).where(User.id == current_user.id))
     await session.commit()
+    deps.invalidate_user(current_user.id)
 
 
 @router.post("/reset-password", response_model=UserResponse)
@@ -36,9 +44,10 @@ async def reset_current_user_password(
     current_user: User = Depends(deps.get_current_user),
 ):
     """Update current user password"""
-    current_user.hashed_password = get_password_hash(user_update_password.password)
+    current_user.hashed_password = await _hash_password(user_update_password.password)
     session.add(current_user)
     await session.commit()
+    deps.invalidate_user(current_user.id)
     return current_user
 
 
@@ -55,7 +64,7 @@ async def register_new_user(
         raise HTTPException(status_code=400, detail="Cannot use this username address")
     user = User(
         username=new_user.username,
-        hashed_password=get_password_hash(new_user.password),
+        hashed_password=await _hash_password(new_user.password),
     )
     session.add(user)
     await session.commit()
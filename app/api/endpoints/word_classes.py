@@ -3,10 +3,11 @@ from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.core.lexicon_stats import refresh_language_stats
 from app.models import User, WordClass
 from app.schemas.requests import WordClassRequest
 from app.schemas.responses import WordClassResponse
-from app.utils.db_utils import verify_ownership
+from app.utils.db_utils import verify_language_ownership, verify_ownership
 
 router = APIRouter()
 
@@ -24,6 +25,7 @@ async def upsert_word_classes(
         current_user=current_user,
         schema=WordClass,
         target_ids=found_ids,
+        language_ids=[x.language_id for x in word_classes],
     )
 
     new_ids = set(*found_ids)
@@ -44,6 +46,8 @@ async def upsert_word_classes(
     for word_class in word_classes:
         merged = await session.merge(WordClass(**word_class.model_dump()))
         upserted.append(merged)
+    await session.flush()
+    await refresh_language_stats(session, *{x.language_id for x in word_classes})
     await session.commit()
     return upserted
 
@@ -52,19 +56,14 @@ async def upsert_word_classes(
 async def get_all_word_classes_by_language(
     language_id: int,
     current_user: User = (Depends(deps.get_current_user)),
-    session: AsyncSession = (Depends(deps.get_session)),
+    session: AsyncSession = (Depends(deps.get_read_session)),
 ):
+    await verify_language_ownership(
+        session, current_user=current_user, language_id=language_id
+    )
     word_classes = (
         await session.scalars(
             select(WordClass).where(WordClass.language_id == language_id)
         )
     ).all()
-
-    await verify_ownership(
-        session,
-        current_user=current_user,
-        schema=WordClass,
-        target_ids=[x.id for x in word_classes],
-    )
-
     return word_classes
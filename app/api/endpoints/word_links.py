@@ -1,15 +1,47 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy import delete, select
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, delete, exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.models import User, WordLink
-from app.schemas.requests import WordLinkRequest
-from app.schemas.responses import WordLinkResponse
+from app.core.lexicon_stats import apply_stats_change, word_contributions
+from app.models import Language, User, Word, WordLink, word_link_to_word
+from app.schemas.requests import WordLinkBulkDeleteRequest, WordLinkRequest
+from app.schemas.responses import BulkDeleteResponse, WordLinkResponse
 
 router = APIRouter()
 
 
+def _used_by_others(current_user: User):
+    """Ids of the word links some other user's words use."""
+    return (
+        select(word_link_to_word.c.word_link_id)
+        .join(Word)
+        .join(Language)
+        .where(Language.user_id != current_user.id)
+    )
+
+
+async def _used_by_others_among(
+    session: AsyncSession, current_user: User, condition
+) -> bool:
+    """Whether other users' words use any of the word links matching
+    `condition`."""
+    return await session.scalar(
+        select(
+            exists().where(condition, WordLink.id.in_(_used_by_others(current_user)))
+        )
+    )
+
+
+def _linked_words(condition):
+    """Words using the word links matching `condition`."""
+    return Word.id.in_(
+        select(word_link_to_word.c.word_id).where(
+            word_link_to_word.c.word_link_id.in_(select(WordLink.id).where(condition))
+        )
+    )
+
+
 @router.post("/", response_model=list[WordLinkResponse])
 async def upsert_word_links(
     word_links: list[WordLinkRequest],
@@ -25,18 +57,66 @@ async def upsert_word_links(
 @router.get("/", response_model=list[WordLinkResponse])
 async def get_word_links(
     current_user: User = Depends(deps.get_current_user),
-    session: AsyncSession = Depends(deps.get_session),
+    session: AsyncSession = Depends(deps.get_read_session),
 ):
     result = await session.execute(select(WordLink).order_by(WordLink.definition))
     word_links = result.scalars().all()
     return word_links
 
 
+@router.post("/bulk_delete", response_model=BulkDeleteResponse)
+async def bulk_delete_word_links(
+    filters: WordLinkBulkDeleteRequest,
+    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Delete every word link matching all the filters given, in one
+    statement.
+
+    Word links are shared, so links other users' words use are left alone,
+    and asking for one of those by id is a 401.
+    """
+    conditions = []
+    if filters.ids is not None:
+        conditions.append(WordLink.id.in_(filters.ids))
+    if filters.part_of_speech is not None:
+        conditions.append(WordLink.part_of_speech == filters.part_of_speech)
+    if filters.unused:
+        conditions.append(WordLink.id.not_in(select(word_link_to_word.c.word_link_id)))
+    if not conditions:
+        raise HTTPException(400, detail="No filters given")
+
+    if filters.ids is not None and await _used_by_others_among(
+        session, current_user, and_(*conditions)
+    ):
+        raise HTTPException(401)
+
+    condition = and_(*conditions, WordLink.id.not_in(_used_by_others(current_user)))
+    before = await word_contributions(session, _linked_words(condition))
+    deleted = await session.scalars(
+        delete(WordLink).where(condition).returning(WordLink.id)
+    )
+    output = {"deleted": sorted(deleted.all())}
+    after = await word_contributions(session, Word.id.in_(before.word_ids))
+    await apply_stats_change(session, before, after)
+    await session.commit()
+    return output
+
+
 @router.delete("/{word_link_id}", status_code=204)
 async def delete_word_link(
     word_link_id: int,
     current_user: User = Depends(deps.get_current_user),
     session: AsyncSession = Depends(deps.get_session),
 ):
-    await session.execute(delete(WordLink).where(WordLink.id == word_link_id))
+    if await _used_by_others_among(session, current_user, WordLink.id == word_link_id):
+        raise HTTPException(401)
+
+    condition = and_(
+        WordLink.id == word_link_id, WordLink.id.not_in(_used_by_others(current_user))
+    )
+    before = await word_contributions(session, _linked_words(condition))
+    await session.execute(delete(WordLink).where(condition))
+    after = await word_contributions(session, Word.id.in_(before.word_ids))
+    await apply_stats_change(session, before, after)
     await session.commit()
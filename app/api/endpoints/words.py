@@ -1,31 +1,541 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+import base64
+import codecs
+import csv
+import io
+import json
+import logging
+from collections.abc import AsyncIterator
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import String, and_, delete, func, insert, select, tuple_, union
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import noload, selectinload
+from starlette.requests import ClientDisconnect
 
 from app.api import deps
-from app.models import Language, User, Word, WordClass, WordLink
-from app.schemas.requests import WordRequest
-from app.schemas.responses import WordResponse
+from app.core import config
+from app.core.lexicon_stats import Contributions, apply_stats_change, word_contributions
+from app.core.phone_patterns import PatternError, get_inventory
+from app.models import (
+    Language,
+    User,
+    Word,
+    WordClass,
+    WordLink,
+    word_class_to_word,
+    word_link_to_word,
+)
+from app.schemas.requests import WordBulkDeleteRequest, WordImportRow, WordRequest
+from app.schemas.responses import BulkDeleteResponse, WordResponse
+from app.utils.db_utils import verify_language_ownership, verify_ownership
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+WORD_RELATIONSHIPS = {"word_links": Word.word_links, "word_classes": Word.word_classes}
+
+
+def _encode_cursor(word: Word) -> str:
+    return base64.urlsafe_b64encode(json.dumps([word.word, word.id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        word, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(word, str) or not isinstance(id, int):
+            raise ValueError()
+    except (ValueError, TypeError):
+        raise HTTPException(400, detail="Invalid cursor")
+    return word, id
+
+
 @router.get("/by_language/{language_id}", response_model=list[WordResponse])
 async def get_all_words(
     language_id: int,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=config.settings.WORDS_PAGE_MAX_SIZE),
+    cursor: str | None = None,
+    fields: str | None = None,
     current_user: User = Depends(deps.get_current_user),
-    session: AsyncSession = Depends(deps.get_session),
+    session: AsyncSession = Depends(deps.get_read_session),
 ):
-    result = await session.execute(
+    """Words ordered by `(word, id)`.
+
+    With `limit`, returns a page of at most that many words and, if there are
+    more, the cursor of the next page in the `X-Next-Cursor` header, to be
+    passed back as `cursor`. `fields` is a comma-separated list of the
+    `WordResponse` fields to return, links and classes are only loaded if
+    they're asked for.
+    """
+    wanted = None
+    if fields is not None:
+        wanted = {x.strip() for x in fields.split(",") if x.strip()}
+        unknown = wanted - WordResponse.model_fields.keys()
+        if unknown:
+            raise HTTPException(
+                400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+
+    stmnt = (
         select(Word)
         .where(Word.language_id == language_id)
         .where(Language.user_id == current_user.id)
         .join(Language)
-        .order_by(Word.word)
+        .order_by(Word.word, Word.id)
+        .options(
+            *[
+                selectinload(relationship)
+                if wanted is None or name in wanted
+                else noload(relationship)
+                for name, relationship in WORD_RELATIONSHIPS.items()
+            ]
+        )
+    )
+    if cursor is not None:
+        stmnt = stmnt.where(tuple_(Word.word, Word.id) > _decode_cursor(cursor))
+    if limit is not None:
+        # one extra to tell whether there's another page
+        stmnt = stmnt.limit(limit + 1)
+
+    words = (await session.scalars(stmnt)).all()
+
+    headers = {}
+    if limit is not None and len(words) > limit:
+        words = words[:limit]
+        headers["X-Next-Cursor"] = _encode_cursor(words[-1])
+
+    if wanted is None:
+        response.headers.update(headers)
+        return words
+    return JSONResponse(
+        [
+            WordResponse.model_validate(word).model_dump(mode="json", include=wanted)
+            for word in words
+        ],
+        headers=headers,
+    )
+
+
+def _search_condition(column, q: str, mode: str):
+    if mode == "prefix":
+        return column.istartswith(q, autoescape=True)
+    if mode == "substring":
+        return column.icontains(q, autoescape=True)
+    # pg_trgm's similarity operator, true above `pg_trgm.similarity_threshold`
+    return column.op("%")(q)
+
+
+@router.get("/by_language/{language_id}/search", response_model=list[WordResponse])
+async def search_words(
+    language_id: int,
+    q: str = Query(min_length=1),
+    mode: Literal["prefix", "substring", "fuzzy"] = "substring",
+    definitions: bool = True,
+    limit: int = Query(20, ge=1, le=config.settings.WORDS_SEARCH_MAX_LIMIT),
+    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_read_session),
+):
+    """Words matching `q`, best first, and if `definitions`, words with a
+    link whose definition matches.
+
+    Matches are ranked by trigram similarity to `q`. All three modes can use
+    the trigram indexes on words and definitions, so they don't slow down as
+    the lexicon grows.
+    """
+    await verify_language_ownership(
+        session, current_user=current_user, language_id=language_id
+    )
+
+    # each half of the union can be answered from its trigram index
+    matches = select(Word.id).where(_search_condition(Word.word, q, mode))
+    rank = func.similarity(Word.word, q)
+    if definitions:
+        matches = union(
+            matches,
+            select(word_link_to_word.c.word_id)
+            .join(WordLink)
+            .where(_search_condition(WordLink.definition, q, mode)),
+        )
+        definition_rank = (
+            select(func.max(func.similarity(WordLink.definition, q)))
+            .join(word_link_to_word)
+            .where(word_link_to_word.c.word_id == Word.id)
+            .scalar_subquery()
+        )
+        rank = func.greatest(rank, func.coalesce(definition_rank, 0))
+
+    words = await session.scalars(
+        select(Word)
+        .where(Word.language_id == language_id)
+        .where(Word.id.in_(matches))
+        .order_by(rank.desc(), Word.word, Word.id)
+        .limit(limit)
+        .options(selectinload(Word.word_links), selectinload(Word.word_classes))
+    )
+    return words.all()
+
+
+@router.get("/by_language/{language_id}/shape", response_model=list[WordResponse])
+async def search_words_by_shape(
+    language_id: int,
+    pattern: str,
+    limit: int = Query(100, ge=1, le=config.settings.WORDS_PAGE_MAX_SIZE),
+    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_read_session),
+):
+    """Words matching a phonological pattern like `CVC` or `*V[long]`, see
+    `app.core.phone_patterns`, ordered by word."""
+    await verify_language_ownership(
+        session, current_user=current_user, language_id=language_id
+    )
+
+    inventory = await get_inventory(session, language_id)
+    try:
+        regex = inventory.compile(pattern)
+    except PatternError as e:
+        raise HTTPException(400, detail=str(e))
+
+    words = await session.scalars(
+        select(Word)
+        .where(Word.language_id == language_id)
+        .where(Word.word.regexp_match(regex))
+        .order_by(Word.word, Word.id)
+        .limit(limit)
+        .options(selectinload(Word.word_links), selectinload(Word.word_classes))
+    )
+    return words.all()
+
+
+# separates the link definitions and class abbreviations of a word in CSV
+CSV_LIST_SEPARATOR = "|"
+EXPORT_FIELDS = ["id", "word", "part_of_speech", "notes", "word_links", "word_classes"]
+
+
+@router.get("/by_language/{language_id}/export")
+async def export_words(
+    language_id: int,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_read_session),
+):
+    """Streams every word of a language as NDJSON or CSV.
+
+    Words are read through a server-side cursor and sent as they are fetched,
+    so memory use doesn't grow with the lexicon. Each word has its links as a
+    list of definitions and its classes as a list of abbreviations, joined
+    with `|` in CSV.
+    """
+    await verify_language_ownership(
+        session, current_user=current_user, language_id=language_id
+    )
+
+    word_links = (
+        select(WordLink.definition)
+        .join(word_link_to_word)
+        .where(word_link_to_word.c.word_id == Word.id)
+        .order_by(WordLink.id)
+        .scalar_subquery()
+    )
+    word_classes = (
+        select(WordClass.abbreviation)
+        .join(word_class_to_word)
+        .where(word_class_to_word.c.word_id == Word.id)
+        .order_by(WordClass.id)
+        .scalar_subquery()
+    )
+    stmnt = (
+        select(
+            Word.id,
+            Word.word,
+            Word.part_of_speech,
+            Word.notes,
+            func.array(word_links, type_=ARRAY(String)).label("word_links"),
+            func.array(word_classes, type_=ARRAY(String)).label("word_classes"),
+        )
+        .where(Word.language_id == language_id)
+        .order_by(Word.word, Word.id)
+        .execution_options(yield_per=config.settings.WORDS_EXPORT_BATCH_SIZE)
+    )
+
+    async def ndjson_lines():
+        result = await session.stream(stmnt)
+        async for rows in result.partitions():
+            yield "".join(json.dumps(row._asdict()) + "\n" for row in rows)
+
+    async def csv_lines():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        result = await session.stream(stmnt)
+        async for rows in result.partitions():
+            for row in rows:
+                writer.writerow(
+                    [
+                        *row[:4],
+                        CSV_LIST_SEPARATOR.join(row.word_links),
+                        CSV_LIST_SEPARATOR.join(row.word_classes),
+                    ]
+                )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    return StreamingResponse(
+        ndjson_lines() if format == "ndjson" else csv_lines(),
+        media_type="application/x-ndjson" if format == "ndjson" else "text/csv",
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="language-{language_id}.{format}"'
+            )
+        },
+    )
+
+
+class _RequestStreamingResponse(StreamingResponse):
+    """A streaming response whose content reads the request body as it goes.
+
+    `StreamingResponse` listens for the client disconnecting while it
+    streams, which would swallow the request body, so this leaves noticing a
+    disconnect to the content, through `request.stream()`.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def _read_lines(request: Request) -> AsyncIterator[tuple[int, str]]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield line_number + 1, buffer
+
+
+async def _read_rows(
+    request: Request, format: str
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    """Parse an upload incrementally, yielding each row's line number and
+    either its fields or why it couldn't be parsed."""
+    if format == "ndjson":
+        async for line_number, line in _read_lines(request):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, "Invalid JSON"
+                continue
+            yield line_number, row if isinstance(row, dict) else "Not an object"
+        return
+
+    header = None
+    record, first_line = "", 0
+    async for line_number, line in _read_lines(request):
+        if not record:
+            first_line = line_number
+        record += line
+        # a quoted field can span lines, the record ends once quotes balance
+        if record.count('"') % 2:
+            continue
+        [values] = list(csv.reader([record])) or [[]]
+        record = ""
+        if not values:
+            continue
+        if header is None:
+            header = values
+            continue
+        row = dict(zip(header, values))
+        for field in ["word_links", "word_classes"]:
+            if field in row:
+                row[field] = [x for x in row[field].split(CSV_LIST_SEPARATOR) if x]
+        if row.get("notes") == "":
+            row["notes"] = None
+        yield first_line, row
+    if record:
+        yield first_line, "Unclosed quote"
+
+
+async def _import_chunk(
+    session: AsyncSession,
+    language_id: int,
+    rows: list[tuple[int, WordImportRow]],
+    link_ids: dict[str, int | None],
+    class_ids: dict[str, int | None],
+) -> tuple[int, list[dict[str, Any]]]:
+    """Write a chunk of rows, returning how many were saved and the errors."""
+    definitions = {x for _, row in rows for x in row.word_links} - link_ids.keys()
+    if definitions:
+        link_ids.update(dict.fromkeys(definitions))
+        link_ids.update(
+            (
+                await session.execute(
+                    select(WordLink.definition, func.min(WordLink.id))
+                    .where(WordLink.definition.in_(definitions))
+                    .group_by(WordLink.definition)
+                )
+            )
+            .tuples()
+            .all()
+        )
+    abbreviations = {x for _, row in rows for x in row.word_classes} - class_ids.keys()
+    if abbreviations:
+        class_ids.update(dict.fromkeys(abbreviations))
+        class_ids.update(
+            (
+                await session.execute(
+                    select(WordClass.abbreviation, func.min(WordClass.id))
+                    .where(WordClass.language_id == language_id)
+                    .where(WordClass.abbreviation.in_(abbreviations))
+                    .group_by(WordClass.abbreviation)
+                )
+            )
+            .tuples()
+            .all()
+        )
+
+    errors = []
+    valid = []
+    for line_number, row in rows:
+        unknown = [
+            f"Unknown word link: {x}" for x in row.word_links if link_ids[x] is None
+        ] + [
+            f"Unknown word class: {x}" for x in row.word_classes if class_ids[x] is None
+        ]
+        if unknown:
+            errors.append({"line": line_number, "error": "; ".join(unknown)})
+        else:
+            valid.append((line_number, row))
+    if not valid:
+        return 0, errors
+
+    try:
+        word_ids = (
+            await session.scalars(
+                insert(Word).returning(Word.id, sort_by_parameter_order=True),
+                [
+                    {
+                        **row.model_dump(exclude={"word_links", "word_classes"}),
+                        "language_id": language_id,
+                    }
+                    for _, row in valid
+                ],
+            )
+        ).all()
+        for table, column, ids, attribute in [
+            (word_link_to_word, "word_link_id", link_ids, "word_links"),
+            (word_class_to_word, "word_class_id", class_ids, "word_classes"),
+        ]:
+            associations = {
+                (word_id, ids[x])
+                for word_id, (_, row) in zip(word_ids, valid)
+                for x in getattr(row, attribute)
+            }
+            if associations:
+                await session.execute(
+                    insert(table),
+                    [{"word_id": word_id, column: id} for word_id, id in associations],
+                )
+        await apply_stats_change(
+            session,
+            Contributions(),
+            await word_contributions(session, Word.id.in_(word_ids)),
+        )
+        await session.commit()
+    except DBAPIError:
+        logger.exception("Could not import words into language %s", language_id)
+        await session.rollback()
+        return 0, errors + [
+            {"line": line_number, "error": "Could not be saved"}
+            for line_number, _ in valid
+        ]
+    return len(valid), errors
+
+
+@router.post("/by_language/{language_id}/import")
+async def import_words(
+    language_id: int,
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Imports new words from an NDJSON or CSV upload, in the format
+    `/export` writes (`id` is ignored).
+
+    The upload is parsed as it arrives and saved `WORDS_IMPORT_CHUNK_SIZE`
+    rows at a time, each chunk committed on its own. The response streams
+    NDJSON: `{"line", "error"}` for every row that couldn't be imported,
+    `{"imported", "failed"}` after every chunk, and finally
+    `{"done": true, "imported", "failed"}`.
+    """
+    await verify_language_ownership(
+        session, current_user=current_user, language_id=language_id
     )
-    words = result.unique().scalars().all()
-    return words
+    chunk_size = config.settings.WORDS_IMPORT_CHUNK_SIZE
+
+    async def progress():
+        imported = failed = 0
+        link_ids: dict[str, int | None] = {}
+        class_ids: dict[str, int | None] = {}
+        chunk: list[tuple[int, WordImportRow]] = []
+
+        async def flush():
+            nonlocal imported, failed
+            saved, errors = await _import_chunk(
+                session, language_id, chunk, link_ids, class_ids
+            )
+            imported += saved
+            failed += len(errors)
+            chunk.clear()
+            return "".join(
+                json.dumps(x) + "\n"
+                for x in [*errors, {"imported": imported, "failed": failed}]
+            )
+
+        try:
+            async for line_number, row in _read_rows(request, format):
+                try:
+                    if isinstance(row, str):
+                        raise ValueError(row)
+                    chunk.append((line_number, WordImportRow.model_validate(row)))
+                except ValidationError as e:
+                    failed += 1
+                    error = e.errors()[0]
+                    message = (
+                        f"{'.'.join(str(x) for x in error['loc'])}: {error['msg']}"
+                    )
+                    yield json.dumps({"line": line_number, "error": message}) + "\n"
+                except ValueError as e:
+                    failed += 1
+                    yield json.dumps({"line": line_number, "error": str(e)}) + "\n"
+
+                if len(chunk) >= chunk_size:
+                    yield await flush()
+        except ClientDisconnect:
+            # whatever was committed stays
+            return
+        if chunk:
+            yield await flush()
+        yield json.dumps({"done": True, "imported": imported, "failed": failed}) + "\n"
+
+    return _RequestStreamingResponse(progress(), media_type="application/x-ndjson")
 
 
 @router.post("/", response_model=list[WordResponse])
@@ -34,52 +544,154 @@ async def upsert_words(
     current_user: User = Depends(deps.get_current_user),
     session: AsyncSession = Depends(deps.get_session),
 ):
+    """Create or update words in bulk.
+
+    Words are written with one `INSERT ... ON CONFLICT` for those with an id
+    and one `INSERT` for new ones, links and classes are resolved with a
+    query each and their association rows replaced in bulk, and it is all
+    committed at once, so either every word is saved or none are.
+    """
+    if len(words) == 0:
+        return []
+
     # first, verify that the user upserting owns the language in question
     language_ids = {word.language_id for word in words}
     if len(language_ids) > 1:
         raise HTTPException(status_code=400, detail="Too many languages")
 
-    language = (
-        (await session.execute(select(Language).where(Language.id.in_(language_ids))))
-        .scalars()
-        .first()
+    # and the words being updated, which could be moved here from elsewhere
+    await verify_ownership(
+        session,
+        current_user=current_user,
+        schema=Word,
+        target_ids=[word.id for word in words if word.id is not None],
+        language_ids=language_ids,
     )
-    if language.user_id != current_user.id:
-        raise HTTPException(status_code=401)
 
-    # now upsert
-    output = []
-    for word in words:
-        word_links = (
-            (
-                await session.scalars(
-                    select(WordLink).where(WordLink.id.in_(word.word_link_ids))
+    # unknown link and class ids are dropped, as they always have been
+    word_link_ids = set(
+        (
+            await session.scalars(
+                select(WordLink.id).where(
+                    WordLink.id.in_({id for x in words for id in x.word_link_ids})
                 )
             )
-            .unique()
-            .all()
-        )
-        word_classes = (
-            (
-                await session.scalars(
-                    select(WordClass).where(WordClass.id.in_(word.word_class_ids))
+        ).all()
+    )
+    word_class_ids = set(
+        (
+            await session.scalars(
+                select(WordClass.id).where(
+                    WordClass.id.in_({id for x in words for id in x.word_class_ids})
                 )
             )
-            .unique()
-            .all()
+        ).all()
+    )
+
+    fields = ["word", "part_of_speech", "notes", "language_id"]
+    # the last version of a word wins if it is sent more than once
+    updates = {
+        word.id: word.model_dump(include={"id", *fields})
+        for word in words
+        if word.id is not None
+    }
+    new_words = [word for word in words if word.id is None]
+    before = await word_contributions(session, Word.id.in_(updates.keys()))
+
+    if updates:
+        stmnt = pg_insert(Word)
+        await session.execute(
+            stmnt.on_conflict_do_update(
+                index_elements=[Word.id],
+                set_={
+                    field: getattr(stmnt.excluded, field)
+                    for field in [*fields, "updated_at"]
+                },
+            ),
+            list(updates.values()),
         )
+    new_ids = []
+    if new_words:
+        new_ids = (
+            await session.scalars(
+                insert(Word).returning(Word.id, sort_by_parameter_order=True),
+                [word.model_dump(include=set(fields)) for word in new_words],
+            )
+        ).all()
+
+    ids = iter(new_ids)
+    word_ids = [next(ids) if word.id is None else word.id for word in words]
 
-        word_to_upsert = Word(
-            **word.model_dump(exclude=["word_link_ids", "word_class_ids"])
+    # replace the words' links and classes
+    last_request = dict(zip(word_ids, words))
+    for table, column, wanted, attribute in [
+        (word_link_to_word, "word_link_id", word_link_ids, "word_link_ids"),
+        (word_class_to_word, "word_class_id", word_class_ids, "word_class_ids"),
+    ]:
+        await session.execute(
+            delete(table).where(table.c.word_id.in_(last_request.keys()))
         )
+        rows = [
+            {"word_id": word_id, column: id}
+            for word_id, word in last_request.items()
+            for id in dict.fromkeys(getattr(word, attribute))
+            if id in wanted
+        ]
+        if rows:
+            await session.execute(insert(table), rows)
 
-        word_to_upsert.word_links = word_links
-        word_to_upsert.word_classes = word_classes
-        word_to_upsert = await session.merge(word_to_upsert)
+    after = await word_contributions(session, Word.id.in_(word_ids))
+    await apply_stats_change(session, before, after)
+    await session.commit()
+
+    upserted = (
+        await session.scalars(
+            select(Word)
+            .where(Word.id.in_(word_ids))
+            .options(selectinload(Word.word_links), selectinload(Word.word_classes))
+            .execution_options(populate_existing=True)
+        )
+    ).all()
+    by_id = {word.id: word for word in upserted}
+    return [by_id[id] for id in word_ids]
 
-        await session.commit()
 
-        output.append(word_to_upsert)
+@router.post("/bulk_delete", response_model=BulkDeleteResponse)
+async def bulk_delete_words(
+    filters: WordBulkDeleteRequest,
+    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(deps.get_session),
+):
+    """Delete every word of a language matching all the filters given, in one
+    statement. Ids from other languages are ignored."""
+    conditions = []
+    if filters.ids is not None:
+        conditions.append(Word.id.in_(filters.ids))
+    if filters.part_of_speech is not None:
+        conditions.append(Word.part_of_speech == filters.part_of_speech)
+    if filters.word_class_id is not None:
+        conditions.append(
+            Word.id.in_(
+                select(word_class_to_word.c.word_id).where(
+                    word_class_to_word.c.word_class_id == filters.word_class_id
+                )
+            )
+        )
+    if not conditions:
+        raise HTTPException(400, detail="No filters given")
+
+    await verify_language_ownership(
+        session, current_user=current_user, language_id=filters.language_id
+    )
+    before = await word_contributions(
+        session, and_(Word.language_id == filters.language_id, *conditions)
+    )
+    deleted = await session.scalars(
+        delete(Word).where(Word.id.in_(before.word_ids)).returning(Word.id)
+    )
+    output = {"deleted": sorted(deleted.all())}
+    await apply_stats_change(session, before, Contributions())
+    await session.commit()
     return output
 
 
@@ -90,13 +702,14 @@ async def delete_word(
     session: AsyncSession = Depends(deps.get_session),
 ):
     # first, verify that the user owns this word
-    word = (
-        await session.scalars(
-            select(Word).where(Word.id == word_id).options(joinedload(Word.language))
-        )
-    ).first()
-    if word.language.user_id != current_user.id:
-        raise HTTPException(401)
+    language_ids = await verify_ownership(
+        session, current_user=current_user, schema=Word, target_ids=[word_id]
+    )
+    if not language_ids:
+        raise HTTPException(404, detail="Word not found")
+    before = await word_contributions(session, Word.id == word_id)
 
-    await session.delete(word)
+    # links and classes go with it through their foreign keys' ON DELETE CASCADE
+    await session.execute(delete(Word).where(Word.id == word_id))
+    await apply_stats_change(session, before, Contributions())
     await session.commit()
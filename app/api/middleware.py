@@ -0,0 +1,44 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import config
+
+LAST_WRITE_HEADER = "X-Last-Write"
+LAST_WRITE_COOKIE = "last_write"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class LastWriteMiddleware:
+    """Tells clients when they last sent something that could have written.
+
+    Responses to any other method than GET, HEAD and OPTIONS carry the time
+    in an `X-Last-Write` header and a `last_write` cookie. Clients send
+    either back, and `deps.get_read_session` keeps them on the primary for
+    `DATABASE_REPLICA_STICKY_SECONDS` after, whichever worker they land on.
+    Headers go out before a streaming body, so this is set by the method
+    rather than by what the request ends up committing.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_last_write(message: Message):
+            if message["type"] == "http.response.start":
+                now = f"{time.time():.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(LAST_WRITE_HEADER, now)
+                headers.append(
+                    "Set-Cookie",
+                    f"{LAST_WRITE_COOKIE}={now}; Path=/; SameSite=Lax; HttpOnly; "
+                    f"Max-Age={int(config.settings.DATABASE_REPLICA_STICKY_SECONDS)}",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_last_write)
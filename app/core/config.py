@@ -39,6 +39,13 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ENVIRONMENT: Literal["DEV", "PYTEST", "STG", "PRD"] = "DEV"
     SECURITY_BCRYPT_ROUNDS: int = 12
+    # threads hashing passwords, and how many logins may wait for one of them
+    SECURITY_HASH_WORKERS: int = 2
+    SECURITY_HASH_MAX_QUEUE: int = 32
+    SECURITY_HASH_QUEUE_TIMEOUT: float = 5.0
+    # signed-in users kept in memory, and for how many seconds
+    AUTH_USER_CACHE_SIZE: int = 10_000
+    AUTH_USER_CACHE_TTL: float = 60.0
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 11520  # 8 days
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 40320  # 28 days
     BACKEND_CORS_ORIGINS: list[AnyHttpUrl] = []
@@ -63,10 +70,65 @@ class Settings(BaseSettings):
     TEST_DATABASE_PORT: int = 5432
     TEST_DATABASE_DB: str = "postgres"
 
+    # DATABASE POOL, per process, so uvicorn's 2 workers open up to twice as many
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+    # seconds to wait for a connection before giving up
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    # reopen connections older than this many seconds
+    DATABASE_POOL_RECYCLE: int = 1800
+    # check connections before handing them out, one extra round trip each
+    DATABASE_POOL_PRE_PING: bool = True
+    # prepared statements asyncpg keeps per connection, 0 to disable
+    DATABASE_STATEMENT_CACHE_SIZE: int = 500
+    # postgresql+asyncpg:// URIs of read replicas for endpoints that only read
+    DATABASE_REPLICA_URIS: list[str] = []
+    # seconds a client's reads stay on the primary after it changes something
+    DATABASE_REPLICA_STICKY_SECONDS: float = 10.0
+
     # FIRST SUPERUSER
     FIRST_SUPERUSER_EMAIL: str
     FIRST_SUPERUSER_PASSWORD: str
 
+    # LEXURGY
+    # 0 disables the worker pool and launches Lexurgy once per ruleset instead
+    LEXURGY_POOL_SIZE: int = 0
+    LEXURGY_POOL_ACQUIRE_TIMEOUT: float = 5.0
+    LEXURGY_REQUEST_TIMEOUT: float = 30.0
+    LEXURGY_HEALTH_CHECK_INTERVAL: float = 30.0
+    # where one-shot runs keep their files, defaults to /dev/shm when available
+    LEXURGY_SCRATCH_DIR: str | None = None
+    # evolve simple rulesets in-process instead of with Lexurgy
+    SCA_PYTHON_ENGINE: bool = True
+    # words evolved on the event loop by that engine, bigger batches of new
+    # words go to a thread so one large /sc/apply doesn't stall other requests
+    SCA_PYTHON_ENGINE_INLINE_WORDS: int = 50
+    SCA_RULESET_CACHE_BYTES: int = 16 * 1024 * 1024
+    SCA_RESULT_CACHE_SIZE: int = 500_000
+    SCA_STREAM_CHUNK_SIZE: int = 500
+
+    # WORDS
+    # largest page `GET /words/by_language/{id}` will return
+    WORDS_PAGE_MAX_SIZE: int = 1000
+    # rows fetched from the server-side cursor at a time when exporting
+    WORDS_EXPORT_BATCH_SIZE: int = 1000
+    # rows written and committed together when importing
+    WORDS_IMPORT_CHUNK_SIZE: int = 1000
+    WORDS_SEARCH_MAX_LIMIT: int = 100
+
+    # PHONOLOGY
+    # languages whose compiled phone inventory is kept for shape searches
+    PHONE_INVENTORY_CACHE_SIZE: int = 1000
+
+    # SOUND CHANGE JOBS
+    SCA_JOB_WORKERS: int = 2
+    SCA_JOB_POLL_INTERVAL: float = 1.0
+    # seconds without a heartbeat after which a running job is requeued
+    SCA_JOB_LEASE_SECONDS: int = 60
+    # jobs a user may have queued or running at once, and running at once
+    SCA_JOB_MAX_ACTIVE_PER_USER: int = 5
+    SCA_JOB_MAX_RUNNING_PER_USER: int = 1
+
     @computed_field
     @cached_property
     def DEFAULT_SQLALCHEMY_DATABASE_URI(self) -> str:
@@ -0,0 +1,262 @@
+"""
+Background sound change jobs, for work that can outlast an HTTP request.
+
+Jobs are rows in `sc_job_model`, there is no separate broker. Every app process
+runs `SCA_JOB_WORKERS` worker tasks that claim queued jobs with
+`FOR UPDATE SKIP LOCKED`, so each job is only run by one worker at a time
+across all uvicorn workers. Workers skip users who already have
+`SCA_JOB_MAX_RUNNING_PER_USER` jobs running, so one user's lexicon can't hold
+up everyone else's. Claims take an advisory lock so that limit holds when
+workers claim at the same moment.
+
+Running jobs hold a lease: their worker refreshes `heartbeat_at` every third
+of `SCA_JOB_LEASE_SECONDS`. Jobs interrupted by a shutdown are put back in
+the queue straight away, and jobs whose process died are requeued by the
+next claim once their lease runs out. Either way they start over.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import config
+from app.core.sca import LexurgyError, apply_ruleset, get_ruleset
+from app.core.session import async_session
+from app.models import GrammarTableCell, SCJob
+from app.utils.utils import get_now_int
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+# first key of the advisory lock serializing claims, lexicon_stats uses 1
+CLAIM_LOCK = 2
+
+Report = Callable[[int], Awaitable[None]]
+
+
+class JobError(Exception):
+    """The job can't be completed, the message is shown to the user."""
+
+
+async def _evolve(session: AsyncSession, ruleset_id: int, words: list[str], report):
+    ruleset = await get_ruleset(session, ruleset_id)
+    if ruleset is None:
+        raise JobError(f"Sound changes {ruleset_id} not found")
+
+    chunk_size = config.settings.SCA_STREAM_CHUNK_SIZE
+    output = []
+    for start in range(0, len(words), chunk_size):
+        chunk = words[start : start + chunk_size]
+        output.extend(await apply_ruleset(ruleset, chunk))
+        await report(len(chunk))
+    return output
+
+
+async def _run_apply(session: AsyncSession, job: SCJob, report: Report):
+    """Same as `/sc/apply`, `payload` is its input with ids already resolved."""
+    results = []
+    for x in json.loads(job.payload):
+        output = await _evolve(session, x["sound_changes_id"], x["word_list"], report)
+        results.append(
+            {
+                "sound_changes_id": x["sound_changes_id"],
+                "input": x["word_list"],
+                "output": output,
+            }
+        )
+    return {
+        "output": [word for x in results for word in x["output"]],
+        "results": results,
+    }
+
+
+async def _run_paradigm(session: AsyncSession, job: SCJob, report: Report):
+    """Inflect every word with every cell of a grammar table."""
+    payload = json.loads(job.payload)
+    cells = (
+        await session.scalars(
+            select(GrammarTableCell)
+            .where(GrammarTableCell.grammar_table_id == payload["grammar_table_id"])
+            .order_by(GrammarTableCell.id)
+        )
+    ).all()
+
+    output = []
+    for cell in cells:
+        forms = await _evolve(
+            session, cell.sound_change_rules_id, payload["word_list"], report
+        )
+        output.append(
+            {
+                "cell_id": cell.id,
+                "row_categories": json.loads(cell.row_categories),
+                "column_categories": json.loads(cell.column_categories),
+                "output": forms,
+            }
+        )
+    return {"input": payload["word_list"], "cells": output}
+
+
+RUNNERS = {"apply": _run_apply, "paradigm": _run_paradigm}
+
+
+def _requeue():
+    return update(SCJob).values(status="queued", done=0, heartbeat_at=None)
+
+
+async def _claim_job() -> str | None:
+    """Mark the oldest job we're allowed to run as running and return its id,
+    after requeueing running jobs whose lease ran out."""
+    expired = get_now_int() - config.settings.SCA_JOB_LEASE_SECONDS
+    busy_users = (
+        select(SCJob.user_id)
+        .where(SCJob.status == "running")
+        .group_by(SCJob.user_id)
+        .having(func.count() >= config.settings.SCA_JOB_MAX_RUNNING_PER_USER)
+    )
+    next_job = (
+        select(SCJob.id)
+        .where(SCJob.status == "queued", SCJob.user_id.not_in(busy_users))
+        .order_by(SCJob.created_at, SCJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    async with async_session() as session:
+        # one claim at a time across all processes, or two workers could each
+        # start one of a user's jobs before seeing the other's
+        await session.execute(select(func.pg_advisory_xact_lock(CLAIM_LOCK, 0)))
+        await session.execute(
+            _requeue()
+            .where(SCJob.status == "running", SCJob.heartbeat_at < expired)
+            .execution_options(synchronize_session=False)
+        )
+        job_id = await session.scalar(
+            update(SCJob)
+            .where(SCJob.id == next_job)
+            .values(status="running", heartbeat_at=get_now_int())
+            .returning(SCJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    return job_id
+
+
+async def _heartbeat(job_id: str):
+    while True:
+        await asyncio.sleep(config.settings.SCA_JOB_LEASE_SECONDS / 3)
+        try:
+            async with async_session() as session:
+                await session.execute(
+                    update(SCJob)
+                    .where(SCJob.id == job_id, SCJob.status == "running")
+                    .values(heartbeat_at=get_now_int())
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+        except Exception:
+            logger.exception("Could not renew the lease of sound change job %s", job_id)
+
+
+async def _run_job(job_id: str):
+    async with async_session() as session:
+        job = await session.get(SCJob, job_id)
+        if job is None:
+            return
+
+        async def report(count: int):
+            job.done += count
+            await session.commit()
+
+        heartbeat = asyncio.create_task(_heartbeat(job_id))
+        try:
+            result = await RUNNERS[job.kind](session, job, report)
+        except asyncio.CancelledError:
+            # shutting down, let another worker start it over
+            async with async_session() as requeue_session:
+                await requeue_session.execute(
+                    _requeue()
+                    .where(SCJob.id == job_id, SCJob.status == "running")
+                    .execution_options(synchronize_session=False)
+                )
+                await requeue_session.commit()
+            raise
+        except (JobError, LexurgyError) as e:
+            await session.rollback()
+            job.status, job.error = "failed", str(e)
+        except Exception:
+            logger.exception("Sound change job %s failed", job_id)
+            await session.rollback()
+            job.status, job.error = "failed", "Internal error"
+        else:
+            job.status, job.result = "done", json.dumps(result)
+        finally:
+            heartbeat.cancel()
+        await session.commit()
+
+
+_wakeup = asyncio.Event()
+_workers: list[asyncio.Task] = []
+
+
+async def _worker():
+    while True:
+        try:
+            job_id = await _claim_job()
+        except Exception:
+            logger.exception("Could not claim a sound change job")
+            job_id = None
+
+        if job_id is None:
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    _wakeup.wait(), timeout=config.settings.SCA_JOB_POLL_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        try:
+            await _run_job(job_id)
+        except Exception:
+            logger.exception("Could not finish sound change job %s", job_id)
+
+
+def start_workers():
+    """Start this process's job workers if they aren't running yet."""
+    if not _workers:
+        for _ in range(config.settings.SCA_JOB_WORKERS):
+            _workers.append(asyncio.create_task(_worker()))
+
+
+async def stop_workers():
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+async def submit_job(
+    session: AsyncSession, *, user_id: str, kind: str, payload, total: int
+) -> SCJob | None:
+    """Queue a job, or return None if the user has too many active already."""
+    active = await session.scalar(
+        select(func.count())
+        .select_from(SCJob)
+        .where(SCJob.user_id == user_id, SCJob.status.in_(ACTIVE_STATUSES))
+    )
+    if active >= config.settings.SCA_JOB_MAX_ACTIVE_PER_USER:
+        return None
+
+    job = SCJob(kind=kind, payload=json.dumps(payload), total=total, user_id=user_id)
+    session.add(job)
+    await session.commit()
+
+    start_workers()
+    _wakeup.set()
+    return job
@@ -0,0 +1,231 @@
+"""
+Per-language lexicon statistics, kept in `language_stats_model`.
+
+Endpoints that change words work out what those words added to their
+languages' statistics before and after the change with `word_contributions`,
+and `apply_stats_change` adds the difference to the stored row in the same
+transaction. That costs as much as the words changed rather than the whole
+language, and reading the statistics is a single-row lookup. Changes that
+can't be expressed per word, like renaming word classes, use
+`refresh_language_stats` to recompute a language from scratch.
+
+Both take a transaction-level advisory lock per language before reading the
+stored row, so concurrent changes to one language are applied one after the
+other instead of overwriting each other.
+"""
+
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    LanguageStats,
+    Word,
+    WordClass,
+    word_class_to_word,
+    word_link_to_word,
+)
+from app.utils.utils import get_now_int
+
+# first key of the advisory locks, the second is the language id
+STATS_LOCK = 1
+
+
+@dataclass
+class Contributions:
+    """What some words add to their languages' statistics."""
+
+    word_ids: list[int] = field(default_factory=list)
+    # language id -> "word_count", "words_with_links", "words_with_classes",
+    # ("part_of_speech", x) and ("word_class", id) -> count
+    by_language: dict[int, Counter] = field(default_factory=dict)
+
+
+async def word_contributions(session: AsyncSession, condition) -> Contributions:
+    """The contributions of the words matching `condition`.
+
+    The words are locked until the transaction ends, so nobody else changes
+    them between this and `apply_stats_change`.
+    """
+    has_links = exists().where(word_link_to_word.c.word_id == Word.id)
+    class_ids = (
+        select(func.array_agg(word_class_to_word.c.word_class_id))
+        .where(word_class_to_word.c.word_id == Word.id)
+        .scalar_subquery()
+    )
+    rows = await session.execute(
+        select(
+            Word.id,
+            Word.language_id,
+            Word.part_of_speech,
+            has_links.label("has_links"),
+            class_ids.label("class_ids"),
+        )
+        .where(condition)
+        .with_for_update(of=Word)
+    )
+
+    contributions = Contributions()
+    for id, language_id, part_of_speech, has_links, class_ids in rows.tuples():
+        contributions.word_ids.append(id)
+        counts = contributions.by_language.setdefault(language_id, Counter())
+        counts["word_count"] += 1
+        counts["words_with_links"] += has_links
+        counts["words_with_classes"] += bool(class_ids)
+        counts["part_of_speech", part_of_speech] += 1
+        for class_id in class_ids or []:
+            counts["word_class", class_id] += 1
+    return contributions
+
+
+async def _lock(session: AsyncSession, language_id: int):
+    await session.execute(select(func.pg_advisory_xact_lock(STATS_LOCK, language_id)))
+
+
+async def _recompute(session: AsyncSession, language_id: int):
+    has_links = exists().where(word_link_to_word.c.word_id == Word.id)
+    has_classes = exists().where(word_class_to_word.c.word_id == Word.id)
+    word_count, words_with_links, words_with_classes = (
+        await session.execute(
+            select(
+                func.count(),
+                func.count().filter(has_links),
+                func.count().filter(has_classes),
+            ).where(Word.language_id == language_id)
+        )
+    ).one()
+
+    by_part_of_speech = (
+        await session.execute(
+            select(Word.part_of_speech, func.count())
+            .where(Word.language_id == language_id)
+            .group_by(Word.part_of_speech)
+            .order_by(Word.part_of_speech)
+        )
+    ).all()
+    by_word_class = (
+        await session.execute(
+            select(
+                WordClass.id,
+                WordClass.name,
+                WordClass.abbreviation,
+                func.count(word_class_to_word.c.word_id),
+            )
+            .outerjoin(word_class_to_word)
+            .where(WordClass.language_id == language_id)
+            .group_by(WordClass.id)
+            .order_by(WordClass.id)
+        )
+    ).all()
+
+    await _save(
+        session,
+        language_id,
+        word_count=word_count,
+        words_with_links=words_with_links,
+        words_with_classes=words_with_classes,
+        by_part_of_speech=dict(by_part_of_speech),
+        by_word_class=[
+            {"id": id, "name": name, "abbreviation": abbr, "count": count}
+            for id, name, abbr, count in by_word_class
+        ],
+    )
+
+
+async def _save(
+    session: AsyncSession,
+    language_id: int,
+    *,
+    by_part_of_speech: dict[str, int],
+    by_word_class: list[dict],
+    **counts: int,
+):
+    values = {
+        **counts,
+        "by_part_of_speech": json.dumps(by_part_of_speech),
+        "by_word_class": json.dumps(by_word_class),
+        "updated_at": get_now_int(),
+    }
+    await session.execute(
+        pg_insert(LanguageStats)
+        .values(language_id=language_id, **values)
+        .on_conflict_do_update(index_elements=["language_id"], set_=values)
+    )
+
+
+async def refresh_language_stats(session: AsyncSession, *language_ids: int):
+    """Recompute the statistics of the given languages, without committing."""
+    # always in the same order, so two of these can't deadlock
+    for language_id in sorted(set(language_ids)):
+        await _lock(session, language_id)
+        await _recompute(session, language_id)
+
+
+async def apply_stats_change(
+    session: AsyncSession, before: Contributions, after: Contributions
+):
+    """Update the statistics by the difference between the contributions of
+    some words before and after changing them, without committing."""
+    for language_id in sorted(before.by_language.keys() | after.by_language.keys()):
+        change = Counter(after.by_language.get(language_id, {}))
+        change.subtract(before.by_language.get(language_id, {}))
+        if not any(change.values()):
+            continue
+
+        await _lock(session, language_id)
+        # whatever was committed by the time we got the lock
+        stored = (
+            await session.execute(
+                select(
+                    LanguageStats.word_count,
+                    LanguageStats.words_with_links,
+                    LanguageStats.words_with_classes,
+                    LanguageStats.by_part_of_speech,
+                    LanguageStats.by_word_class,
+                ).where(LanguageStats.language_id == language_id)
+            )
+        ).one_or_none()
+        by_word_class = json.loads(stored.by_word_class) if stored else []
+        known_classes = {x["id"]: x for x in by_word_class}
+        if stored is None or any(
+            key[0] == "word_class" and key[1] not in known_classes
+            for key in change
+            if isinstance(key, tuple)
+        ):
+            # no statistics yet, or a word class we don't have a name for
+            await _recompute(session, language_id)
+            continue
+
+        by_part_of_speech = Counter(json.loads(stored.by_part_of_speech))
+        for key, count in change.items():
+            if isinstance(key, tuple) and key[0] == "part_of_speech":
+                by_part_of_speech[key[1]] += count
+            elif isinstance(key, tuple):
+                known_classes[key[1]]["count"] += count
+        await _save(
+            session,
+            language_id,
+            word_count=stored.word_count + change["word_count"],
+            words_with_links=stored.words_with_links + change["words_with_links"],
+            words_with_classes=(
+                stored.words_with_classes + change["words_with_classes"]
+            ),
+            by_part_of_speech={
+                x: count for x, count in sorted(by_part_of_speech.items()) if count
+            },
+            by_word_class=by_word_class,
+        )
+
+
+async def get_language_stats(session: AsyncSession, language_id: int) -> LanguageStats:
+    stats = await session.get(LanguageStats, language_id)
+    if stats is None:
+        # a language that hasn't changed since statistics were introduced
+        await refresh_language_stats(session, language_id)
+        await session.commit()
+        stats = await session.get(LanguageStats, language_id)
+    return stats
@@ -0,0 +1,125 @@
+"""
+Searching a lexicon by phonological shape, with patterns like `CVC` or `*V[long]`.
+
+    C         any consonant in the language's inventory
+    V         any vowel
+    V[long]   a vowel (or consonant, with C) of that quality
+    *         anything, including nothing
+    ?         after any of the above, makes it optional
+    anything else is matched as is, e.g. `sV*` for words starting with s
+
+Patterns match whole words. They are compiled to a regular expression over the
+language's composed phones, longest first so that `V` matches all of `aː`
+rather than just the `a`, and Postgres runs it with `~`.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import config
+from app.models import Phone
+from app.utils.cache import LRUCache
+
+CLASSES = {"C": False, "V": True}
+PATTERN_TOKEN = re.compile(
+    r"(?P<cls>[CV])(?:\[(?P<quality>[^\]]*)\])?|(?P<any>\*)|(?P<optional>\?)"
+    r"|(?P<literal>[^CV*?\[\]]+)|(?P<bad>.)"
+)
+
+
+class PatternError(Exception):
+    """The pattern can't be compiled, the message is shown to the user."""
+
+
+def _alternation(phones: list[str]) -> str:
+    return (
+        "(?:"
+        + "|".join(re.escape(x) for x in sorted(set(phones), key=len, reverse=True))
+        + ")"
+    )
+
+
+@dataclass
+class Inventory:
+    language_id: int
+    fingerprint: str
+    # (vowel, quality) -> regex for those phones, quality None meaning any
+    classes: dict[tuple[bool, str | None], str] = field(default_factory=dict)
+
+    @classmethod
+    def from_phones(cls, language_id: int, fingerprint: str, phones: list[Phone]):
+        inventory = cls(language_id=language_id, fingerprint=fingerprint)
+        grouped: dict[tuple[bool, str | None], list[str]] = {}
+        for phone in phones:
+            grouped.setdefault((phone.vowel, None), []).append(phone.composed_phone)
+            if phone.quality:
+                grouped.setdefault((phone.vowel, phone.quality), []).append(
+                    phone.composed_phone
+                )
+        inventory.classes = {key: _alternation(x) for key, x in grouped.items()}
+        return inventory
+
+    def compile(self, pattern: str) -> str:
+        """Turn a pattern into a Postgres regular expression."""
+        if not pattern:
+            raise PatternError("Empty pattern")
+
+        parts: list[str] = []
+        for match in PATTERN_TOKEN.finditer(pattern):
+            if match["cls"]:
+                key = (CLASSES[match["cls"]], match["quality"] or None)
+                if key not in self.classes:
+                    quality = f"{match['quality']} " if match["quality"] else ""
+                    kind = "vowels" if key[0] else "consonants"
+                    raise PatternError(f"The language has no {quality}{kind}")
+                parts.append(self.classes[key])
+            elif match["any"]:
+                parts.append(".*")
+            elif match["optional"]:
+                if not parts or parts[-1].endswith(("?", "*")):
+                    raise PatternError("Nothing to make optional")
+                parts.append("?")
+            elif match["literal"]:
+                # `?` only applies to the last character of literal text
+                parts.extend(re.escape(x) for x in match["literal"])
+            else:
+                raise PatternError(f"Unexpected {match['bad']!r} in pattern")
+        return "^" + "".join(parts) + "$"
+
+
+_inventories = LRUCache(max_weight=config.settings.PHONE_INVENTORY_CACHE_SIZE)
+
+
+async def get_inventory(session: AsyncSession, language_id: int) -> Inventory:
+    """Load a language's phone inventory, compiling it if it isn't cached yet.
+
+    Like rulesets, inventories are cached by a hash Postgres computes, so
+    changes made through any worker are picked up on the next search.
+    """
+    fingerprint = await session.scalar(
+        select(
+            func.md5(
+                func.string_agg(
+                    func.concat_ws(":", Phone.base_phone, Phone.quality, Phone.vowel),
+                    aggregate_order_by(",", Phone.id),
+                )
+            )
+        ).where(Phone.language_id == language_id)
+    )
+    # no phones at all
+    fingerprint = fingerprint or ""
+
+    key = (language_id, fingerprint)
+    inventory = _inventories.get(key)
+    if inventory is None:
+        phones = (
+            await session.scalars(select(Phone).where(Phone.language_id == language_id))
+        ).all()
+        inventory = Inventory.from_phones(language_id, fingerprint, phones)
+        _inventories.discard_where(lambda x: x[0] == language_id)
+        _inventories.set(key, inventory)
+    return inventory
@@ -0,0 +1,406 @@
+"""
+Lexurgy sound change application.
+
+Launching Lexurgy means a JVM startup and a fresh parse of the rules on every
+call. When `LEXURGY_POOL_SIZE` is set we keep a pool of long-lived
+`lexurgy server` processes instead and talk to them over stdin/stdout, one JSON
+object per line in each direction.
+
+https://www.meamoria.com/lexurgy/html/sc-tutorial.html
+"""
+
+import asyncio
+import json
+import os
+import re
+import signal
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import config
+from app.core.sca_engine import CompiledRules, UnsupportedSyntax, compile_rules
+from app.models import SoundChangeRules
+from app.utils.cache import LRUCache
+
+LEXURGY_PATH = Path(__file__).parent / "lexurgy" / "bin" / "lexurgy"
+# asyncio's default 64 KiB line limit is too small for a whole lexicon
+STREAM_LIMIT = 64 * 1024 * 1024
+HEALTH_CHECK_RULES = "health-check:\nunchanged"
+
+
+class LexurgyError(Exception):
+    """Lexurgy failed for reasons unrelated to the rules it was given."""
+
+
+class LexurgyRulesError(LexurgyError):
+    """Lexurgy rejected the sound change rules."""
+
+
+class LexurgyTimeoutError(LexurgyError):
+    """Lexurgy ran past `LEXURGY_REQUEST_TIMEOUT` and was killed."""
+
+
+class LexurgyBusyError(LexurgyError):
+    """No worker became free within `LEXURGY_POOL_ACQUIRE_TIMEOUT`."""
+
+
+def _kill(process: asyncio.subprocess.Process):
+    """Kill Lexurgy's whole process group, the launcher script's children too."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+class LexurgyWorker:
+    """A single `lexurgy server` process."""
+
+    def __init__(self):
+        self.process: asyncio.subprocess.Process | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            str(LEXURGY_PATH),
+            "server",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT,
+            start_new_session=True,
+        )
+
+    async def stop(self):
+        process = self.process
+        self.kill()
+        if process is not None:
+            await process.wait()
+
+    async def restart(self):
+        await self.stop()
+        await self.start()
+
+    def kill(self):
+        """Kill the process without waiting on it, so it is safe to call while
+        the current task is being cancelled. The pool restarts killed workers
+        the next time they are handed out."""
+        if self.process is None:
+            return
+        _kill(self.process)
+        self.process = None
+
+    async def apply(self, changes: str, words: list[str]) -> list[str]:
+        request = {"type": "apply", "changes": changes, "inputWords": words}
+        self.process.stdin.write(json.dumps(request).encode() + b"\n")
+        await self.process.stdin.drain()
+
+        line = await self.process.stdout.readline()
+        if not line:
+            raise LexurgyError("Lexurgy worker exited unexpectedly")
+        response = json.loads(line)
+        if response.get("type") == "error":
+            raise LexurgyRulesError(response.get("message", "Invalid sound changes"))
+        return response["outputWords"]
+
+
+class LexurgyPool:
+    """A fixed number of Lexurgy workers shared by every request in this process.
+
+    Callers wait up to `LEXURGY_POOL_ACQUIRE_TIMEOUT` seconds for a free worker
+    and get a `LexurgyBusyError` after that, rather than queueing without bound.
+    Workers that crash, time out or get cancelled mid-request are killed and
+    restarted the next time they are handed out, and idle workers are pinged
+    every `LEXURGY_HEALTH_CHECK_INTERVAL` seconds.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: asyncio.Queue[LexurgyWorker] = asyncio.Queue()
+        self._workers: list[LexurgyWorker] = []
+        self._health_check_task: asyncio.Task | None = None
+
+    async def start(self):
+        try:
+            for _ in range(self.size):
+                worker = LexurgyWorker()
+                await worker.start()
+                self._workers.append(worker)
+                self._idle.put_nowait(worker)
+        except BaseException:
+            await self.stop()
+            raise
+        self._health_check_task = asyncio.create_task(self._health_check_loop())
+
+    async def stop(self):
+        if self._health_check_task is not None:
+            self._health_check_task.cancel()
+        for worker in self._workers:
+            await worker.stop()
+
+    async def apply(self, changes: str, words: list[str]) -> list[str]:
+        try:
+            worker = await asyncio.wait_for(
+                self._idle.get(), timeout=config.settings.LEXURGY_POOL_ACQUIRE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            raise LexurgyBusyError("All Lexurgy workers are busy")
+
+        try:
+            if not worker.alive:
+                await worker.restart()
+            return await asyncio.wait_for(
+                worker.apply(changes, words),
+                timeout=config.settings.LEXURGY_REQUEST_TIMEOUT,
+            )
+        except LexurgyRulesError:
+            raise
+        except asyncio.TimeoutError:
+            worker.kill()
+            raise LexurgyTimeoutError("Lexurgy timed out")
+        except BaseException:
+            # the worker may be halfway through a response, don't reuse it
+            worker.kill()
+            raise
+        finally:
+            self._idle.put_nowait(worker)
+
+    async def _health_check_loop(self):
+        while True:
+            await asyncio.sleep(config.settings.LEXURGY_HEALTH_CHECK_INTERVAL)
+            # only check workers that are idle right now, never wait on busy ones
+            for _ in range(self._idle.qsize()):
+                worker = self._idle.get_nowait()
+                try:
+                    if not worker.alive:
+                        await worker.restart()
+                    await asyncio.wait_for(
+                        worker.apply(HEALTH_CHECK_RULES, []),
+                        timeout=config.settings.LEXURGY_REQUEST_TIMEOUT,
+                    )
+                except Exception:
+                    worker.kill()
+                finally:
+                    self._idle.put_nowait(worker)
+
+
+_pool: LexurgyPool | None = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_pool() -> LexurgyPool:
+    """Return this process's worker pool, starting it on first use."""
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            pool = LexurgyPool(config.settings.LEXURGY_POOL_SIZE)
+            await pool.start()
+            _pool = pool
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.stop()
+        _pool = None
+
+
+def _scratch_root() -> str | None:
+    """Prefer tmpfs for Lexurgy's scratch files, they never need to hit disk."""
+    if config.settings.LEXURGY_SCRATCH_DIR:
+        return config.settings.LEXURGY_SCRATCH_DIR
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return None
+
+
+def _write_cli_inputs(cwd: str, changes: str, words: list[str]):
+    with open(os.path.join(cwd, "input.wli"), "w") as word_list:
+        word_list.write("\n".join(words))
+    with open(os.path.join(cwd, "sc.lsc"), "w") as sc_file:
+        sc_file.write(changes)
+
+
+def _read_cli_output(cwd: str) -> list[str]:
+    with open(os.path.join(cwd, "input_ev.wli")) as out_file:
+        return out_file.read().splitlines()
+
+
+async def _wait_for_final_forms(process: asyncio.subprocess.Process):
+    """Lexurgy doesn't always exit on its own, so stop it once it reports
+    having written its output."""
+    output = []
+    async for line in process.stdout:
+        line = line.decode(errors="replace")
+        if "Wrote the final forms" in line:
+            process.terminate()
+            return
+        output.append(line)
+    raise LexurgyError("".join(output[-5:]).strip() or "Lexurgy exited early")
+
+
+async def _apply_with_cli(changes: str, words: list[str]) -> list[str]:
+    """Run a one-off `lexurgy sc` process, used when the pool is disabled.
+
+    Every call gets its own scratch directory, so concurrent calls can't
+    overwrite each other's input or read each other's output. The process is
+    killed if it runs past `LEXURGY_REQUEST_TIMEOUT` or the call is cancelled.
+    """
+    with tempfile.TemporaryDirectory(prefix="lexurgy-", dir=_scratch_root()) as cwd:
+        await asyncio.to_thread(_write_cli_inputs, cwd, changes, words)
+
+        process = await asyncio.create_subprocess_exec(
+            str(LEXURGY_PATH),
+            "sc",
+            "sc.lsc",
+            "input.wli",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            cwd=cwd,
+            start_new_session=True,
+        )
+        try:
+            await asyncio.wait_for(
+                _wait_for_final_forms(process),
+                timeout=config.settings.LEXURGY_REQUEST_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            raise LexurgyTimeoutError("Lexurgy timed out")
+        finally:
+            _kill(process)
+            await process.wait()
+
+        return await asyncio.to_thread(_read_cli_output, cwd)
+
+
+async def apply_sound_changes(changes: str, words: list[str]) -> list[str]:
+    """Evolve `words` with the Lexurgy ruleset `changes`, preserving order."""
+    if config.settings.LEXURGY_POOL_SIZE > 0:
+        pool = await get_pool()
+        return await pool.apply(changes, words)
+    return await _apply_with_cli(changes, words)
+
+
+@dataclass
+class Ruleset:
+    """A `SoundChangeRules.content` as of `content_hash`.
+
+    `error` remembers Lexurgy rejecting the rules, so a broken ruleset fails
+    straight away on later calls instead of going back to Lexurgy. `compiled`
+    is set when the rules fit the in-process engine in `app.core.sca_engine`.
+    """
+
+    id: int
+    content_hash: str
+    content: str
+    error: str | None = None
+    compiled: CompiledRules | None = None
+
+
+# keyed by (SoundChangeRules.id, md5 of content), weighed by size of the content
+_rulesets = LRUCache(
+    max_weight=config.settings.SCA_RULESET_CACHE_BYTES,
+    weigher=lambda ruleset: len(ruleset.content.encode()),
+)
+# evolved forms, keyed by (ruleset content hash, input word)
+_results = LRUCache(max_weight=config.settings.SCA_RESULT_CACHE_SIZE)
+
+
+def _compile(content: str) -> CompiledRules | None:
+    if not config.settings.SCA_PYTHON_ENGINE:
+        return None
+    try:
+        return compile_rules(content)
+    except (UnsupportedSyntax, re.error):
+        return None
+
+
+async def get_ruleset(session: AsyncSession, ruleset_id: int) -> Ruleset | None:
+    """Load a ruleset, only fetching its content when it isn't cached yet.
+
+    Postgres hashes the content for us, so a cache hit costs a single-row
+    query for 32 bytes and an edit made through another worker is never
+    served stale.
+    """
+    content_hash = await session.scalar(
+        select(func.md5(SoundChangeRules.content)).where(
+            SoundChangeRules.id == ruleset_id
+        )
+    )
+    if content_hash is None:
+        return None
+
+    key = (ruleset_id, content_hash)
+    ruleset = _rulesets.get(key)
+    if ruleset is None:
+        content = await session.scalar(
+            select(SoundChangeRules.content).where(SoundChangeRules.id == ruleset_id)
+        )
+        ruleset = Ruleset(
+            id=ruleset_id,
+            content_hash=content_hash,
+            content=content,
+            compiled=_compile(content),
+        )
+        _rulesets.set(key, ruleset)
+    return ruleset
+
+
+def invalidate_ruleset(ruleset_id: int):
+    """Forget every cached version of a ruleset, e.g. after it was edited."""
+    _rulesets.discard_where(lambda key: key[0] == ruleset_id)
+
+
+def _apply_compiled(compiled: CompiledRules, words: list[str]) -> list[str]:
+    return [compiled.apply(word) for word in words]
+
+
+async def apply_ruleset(ruleset: Ruleset, words: list[str]) -> list[str]:
+    """Evolve `words` with `ruleset`, in order.
+
+    Lexurgy evolves every word on its own, so results are memoized per
+    (content hash, word) and only words we haven't seen under this exact
+    version of the rules are evolved. Rulesets the in-process engine
+    understands never go to Lexurgy at all. More than
+    `SCA_PYTHON_ENGINE_INLINE_WORDS` new words are evolved in a thread, so
+    the event loop keeps serving requests meanwhile, fewer aren't worth it.
+    """
+    if ruleset.error is not None:
+        raise LexurgyRulesError(ruleset.error)
+
+    output = [_results.get((ruleset.content_hash, word)) for word in words]
+    misses = list(
+        dict.fromkeys(word for word, result in zip(words, output) if result is None)
+    )
+    if not misses:
+        return output
+
+    if ruleset.compiled is not None:
+        if len(misses) <= config.settings.SCA_PYTHON_ENGINE_INLINE_WORDS:
+            evolved = _apply_compiled(ruleset.compiled, misses)
+        else:
+            # regexes over a whole lexicon take long enough to stall requests
+            evolved = await asyncio.to_thread(_apply_compiled, ruleset.compiled, misses)
+    else:
+        try:
+            evolved = await apply_sound_changes(ruleset.content, misses)
+        except LexurgyRulesError as e:
+            ruleset.error = str(e)
+            raise
+    if len(evolved) != len(misses):
+        raise LexurgyError(
+            f"Lexurgy returned {len(evolved)} forms for {len(misses)} words"
+        )
+
+    found = dict(zip(misses, evolved))
+    for word, result in found.items():
+        _results.set((ruleset.content_hash, word), result)
+    return [
+        found[word] if result is None else result for word, result in zip(words, output)
+    ]
@@ -0,0 +1,263 @@
+"""
+In-process sound change engine for a subset of Lexurgy's syntax.
+
+Simple rulesets don't need a JVM: they are parsed once into precompiled regular
+expressions and applied without a subprocess. `compile_rules` raises
+`UnsupportedSyntax` for anything outside the subset below, and the caller falls
+back to Lexurgy for those rulesets.
+
+    # comments
+    Class vowel {a, e, i, o, u}
+    Class stop {p, t, k}
+
+    rule-name:
+        th => t
+        {p, t, k} => {b, d, g} / @vowel _ @vowel
+        @vowel => * / _ $
+        * => e / $ _ s
+    another-rule:
+        unchanged
+
+- Rules run in order. Within a rule, each expression is tried in turn at every
+  position of the word and the first that matches wins. Matches never overlap,
+  and environments are checked against the word as it was before the rule,
+  so all of a rule's changes happen at once, as in Lexurgy.
+- A match is text, a `{...}` list, a `@class`, or `*` for an insertion (which
+  needs an environment). A result is text, `*` for a deletion, or a list or
+  class of the same length as a list or class match.
+- An environment is `before _ after`, each side a sequence of text, lists and
+  classes, with `$` for the word boundary at its outer edge.
+
+https://www.meamoria.com/lexurgy/html/sc-tutorial.html
+"""
+
+import re
+from dataclasses import dataclass
+
+# characters that mean something in Lexurgy syntax we don't implement
+SPECIAL_CHARACTERS = set("{}[]()<>@$_*/=!&~%+:,|\\\"'.?^")
+RULE_NAME = re.compile(r"^([a-z0-9][a-z0-9-]*):$")
+RESERVED_RULE_NAMES = {"then", "else"}
+CLASS_DECLARATION = re.compile(r"^Class\s+([A-Za-z0-9-]+)\s*\{(.*)\}$")
+BOUNDARY = "$"
+
+Segment = tuple[str, ...]
+
+
+class UnsupportedSyntax(Exception):
+    """The rules use Lexurgy features this engine doesn't implement."""
+
+
+def _parse_list(text: str, classes: dict[str, Segment]) -> Segment:
+    members: list[str] = []
+    for member in (x.strip() for x in text.split(",")):
+        if member.startswith("@") and member[1:] in classes:
+            members.extend(classes[member[1:]])
+        elif member and not any(c.isspace() or c in SPECIAL_CHARACTERS for c in member):
+            members.append(member)
+        else:
+            raise UnsupportedSyntax(f"Unsupported list member: {member!r}")
+    return tuple(members)
+
+
+def _parse_sequence(text: str, classes: dict[str, Segment]) -> list[Segment | str]:
+    """Split text into segments, each the tuple of strings it can match."""
+    items: list[Segment | str] = []
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if c.isspace():
+            i += 1
+        elif c == "{":
+            end = text.find("}", i)
+            if end == -1:
+                raise UnsupportedSyntax(f"Unclosed list in {text!r}")
+            items.append(_parse_list(text[i + 1 : end], classes))
+            i = end + 1
+        elif c == "@":
+            match = re.match(r"@([A-Za-z0-9-]+)", text[i:])
+            if match is None or match[1] not in classes:
+                raise UnsupportedSyntax(f"Unknown class in {text!r}")
+            items.append(classes[match[1]])
+            i += len(match[0])
+        elif c == BOUNDARY and not text[i + 1 : i + 2].isdigit():
+            items.append(BOUNDARY)
+            i += 1
+        elif c in SPECIAL_CHARACTERS:
+            raise UnsupportedSyntax(f"Unsupported syntax {c!r} in {text!r}")
+        else:
+            items.append((c,))
+            i += 1
+    return items
+
+
+def _to_regex(segments: list[Segment]) -> str:
+    return "".join(
+        "(?:"
+        + "|".join(re.escape(x) for x in sorted(segment, key=len, reverse=True))
+        + ")"
+        for segment in segments
+    )
+
+
+def _compile_environment(
+    text: str, classes: dict[str, Segment]
+) -> tuple[re.Pattern | None, re.Pattern | None]:
+    sides = text.split("_")
+    if len(sides) != 2:
+        raise UnsupportedSyntax(f"Unsupported environment {text!r}")
+    before = _parse_sequence(sides[0], classes)
+    after = _parse_sequence(sides[1], classes)
+
+    before_regex = after_regex = None
+    if before:
+        at_start = before[0] == BOUNDARY
+        segments = before[1:] if at_start else before
+        if BOUNDARY in segments:
+            raise UnsupportedSyntax(f"Unsupported environment {text!r}")
+        before_regex = re.compile(
+            ("\\A" if at_start else "") + _to_regex(segments) + "\\Z"
+        )
+    if after:
+        at_end = after[-1] == BOUNDARY
+        segments = after[:-1] if at_end else after
+        if BOUNDARY in segments:
+            raise UnsupportedSyntax(f"Unsupported environment {text!r}")
+        after_regex = re.compile(_to_regex(segments) + ("\\Z" if at_end else ""))
+    return before_regex, after_regex
+
+
+@dataclass
+class _Expression:
+    # None for insertions, which match the empty string
+    match: re.Pattern | None
+    # the replacement text, or for list/class correspondences, a lookup from
+    # each matched alternative to its replacement
+    result: str | dict[str, str]
+    before: re.Pattern | None
+    after: re.Pattern | None
+
+    def replace_at(self, word: str, pos: int) -> tuple[str, int] | None:
+        if self.match is None:
+            end = pos
+        else:
+            match = self.match.match(word, pos)
+            if match is None:
+                return None
+            end = match.end()
+        if self.before is not None and self.before.search(word, 0, pos) is None:
+            return None
+        if self.after is not None and self.after.match(word, end) is None:
+            return None
+
+        if isinstance(self.result, dict):
+            return self.result[word[pos:end]], end
+        return self.result, end
+
+
+def _parse_expression(line: str, classes: dict[str, Segment]) -> _Expression:
+    if line.count("=>") != 1 or "//" in line or line.count("/") > 1:
+        raise UnsupportedSyntax(f"Unsupported expression {line!r}")
+    match_text, rest = (x.strip() for x in line.split("=>"))
+    result_text, _, environment = (x.strip() for x in rest.partition("/"))
+
+    before = after = None
+    if environment:
+        before, after = _compile_environment(environment, classes)
+
+    if match_text == "*":
+        if before is None and after is None:
+            raise UnsupportedSyntax(f"Insertion without environment: {line!r}")
+        match_segments = []
+    else:
+        match_segments = _parse_sequence(match_text, classes)
+        if not match_segments or BOUNDARY in match_segments:
+            raise UnsupportedSyntax(f"Unsupported match {match_text!r}")
+
+    result: str | dict[str, str]
+    result_segments = (
+        [] if result_text == "*" else _parse_sequence(result_text, classes)
+    )
+    if BOUNDARY in result_segments or (not result_segments and result_text != "*"):
+        raise UnsupportedSyntax(f"Unsupported result {result_text!r}")
+    if all(len(segment) == 1 for segment in result_segments):
+        result = "".join(segment[0] for segment in result_segments)
+    elif (
+        len(match_segments) == 1
+        and len(result_segments) == 1
+        and len(match_segments[0]) == len(result_segments[0])
+    ):
+        result = {}
+        for old, new in zip(match_segments[0], result_segments[0]):
+            result.setdefault(old, new)
+    else:
+        raise UnsupportedSyntax(f"Unsupported result {result_text!r}")
+
+    return _Expression(
+        match=re.compile(_to_regex(match_segments)) if match_segments else None,
+        result=result,
+        before=before,
+        after=after,
+    )
+
+
+def _apply_rule(expressions: list[_Expression], word: str) -> str:
+    output = []
+    pos = 0
+    while pos <= len(word):
+        replaced = next(
+            (
+                replaced
+                for replaced in (x.replace_at(word, pos) for x in expressions)
+                if replaced is not None
+            ),
+            None,
+        )
+        if replaced is not None:
+            text, end = replaced
+            output.append(text)
+            if end > pos:
+                pos = end
+                continue
+        # nothing matched here, or only an insertion did, copy the character over
+        if pos < len(word):
+            output.append(word[pos])
+        pos += 1
+    return "".join(output)
+
+
+class CompiledRules:
+    def __init__(self, rules: list[list[_Expression]]):
+        self.rules = rules
+
+    def apply(self, word: str) -> str:
+        for expressions in self.rules:
+            word = _apply_rule(expressions, word)
+        return word
+
+
+def compile_rules(content: str) -> CompiledRules:
+    """Compile a Lexurgy ruleset, raising `UnsupportedSyntax` if it uses
+    anything this engine doesn't implement."""
+    classes: dict[str, Segment] = {}
+    rules: list[list[_Expression]] = []
+    current: list[_Expression] | None = None
+
+    for raw_line in content.splitlines():
+        line = raw_line.split("#", 1)[0].strip()
+        if not line:
+            continue
+
+        if match := CLASS_DECLARATION.match(line):
+            classes[match[1]] = _parse_list(match[2], classes)
+        elif match := RULE_NAME.match(line):
+            if match[1] in RESERVED_RULE_NAMES:
+                raise UnsupportedSyntax(f"Unsupported block {line!r}")
+            current = []
+            rules.append(current)
+        elif current is None:
+            raise UnsupportedSyntax(f"Unsupported declaration {line!r}")
+        elif line != "unchanged":
+            current.append(_parse_expression(line, classes))
+
+    return CompiledRules(rules)
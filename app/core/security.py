@@ -1,6 +1,9 @@
 """Black-box security shortcuts to generate JWT tokens and password hashing and verifcation."""
 
+import asyncio
+import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import jwt
 from passlib.context import CryptContext
@@ -9,6 +12,8 @@ from pydantic import BaseModel
 from app.core import config
 from app.schemas.responses import AccessTokenResponse
 
+logger = logging.getLogger(__name__)
+
 JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_SECS = config.settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
 REFRESH_TOKEN_EXPIRE_SECS = config.settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
@@ -87,3 +92,97 @@ def get_password_hash(password: str) -> str:
     It takes about 0.3s for default 12 rounds of SECURITY_BCRYPT_DEFAULT_ROUNDS.
     """
     return PWD_CONTEXT.hash(password)
+
+
+class PasswordHashingBusy(Exception):
+    """Too many passwords are waiting to be hashed, try again later."""
+
+
+class HashingPool:
+    """Runs bcrypt in a few threads so it doesn't block the event loop.
+
+    At most `workers` hashes run at once. Up to `max_queue` more callers wait
+    for a thread, for at most `queue_timeout` seconds, and anyone past that
+    gets `PasswordHashingBusy` straight away, so a burst of logins is turned
+    away instead of piling up behind each other.
+    """
+
+    def __init__(self, workers: int, max_queue: int, queue_timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(workers)
+        self._waiting = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.total_queue_time = 0.0
+        self.max_queue_time = 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "workers": self.workers,
+            "waiting": self._waiting,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "avg_queue_time": self.total_queue_time / max(self.submitted, 1),
+            "max_queue_time": self.max_queue_time,
+        }
+
+    async def run(self, fn, *args):
+        if self._waiting >= self.max_queue and self._slots.locked():
+            self.rejected += 1
+            raise PasswordHashingBusy("Too many requests, try again later")
+
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        try:
+            # not wait_for, which can time out after acquiring and leak the slot
+            async with asyncio.timeout(self.queue_timeout):
+                await self._slots.acquire()
+        except TimeoutError:
+            self.rejected += 1
+            raise PasswordHashingBusy("Too many requests, try again later")
+        finally:
+            self._waiting -= 1
+
+        queue_time = time.perf_counter() - queued_at
+        self.submitted += 1
+        self.total_queue_time += queue_time
+        self.max_queue_time = max(self.max_queue_time, queue_time)
+        if queue_time > 1:
+            logger.warning("Waited %.2fs to hash a password", queue_time)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.workers, thread_name_prefix="password-hashing"
+            )
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(fn, *args)
+        # a cancelled caller doesn't stop the thread, keep the slot until it's done
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        self.in_flight -= 1
+        self._slots.release()
+
+
+hashing = HashingPool(
+    workers=config.settings.SECURITY_HASH_WORKERS,
+    max_queue=config.settings.SECURITY_HASH_MAX_QUEUE,
+    queue_timeout=config.settings.SECURITY_HASH_QUEUE_TIMEOUT,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """`verify_password` in the hashing pool, raises `PasswordHashingBusy`."""
+    return await hashing.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """`get_password_hash` in the hashing pool, raises `PasswordHashingBusy`."""
+    return await hashing.run(get_password_hash, password)
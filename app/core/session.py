@@ -4,9 +4,16 @@ SQLAlchemy async engine and sessions tools
 https://docs.sqlalchemy.org/en/20/orm/extensions/asyncio.html
 """
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import itertools
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core import config
+from app.utils.cache import LRUCache
 
 if config.settings.ENVIRONMENT == "PYTEST":
     sqlalchemy_database_uri = config.settings.TEST_SQLALCHEMY_DATABASE_URI
@@ -14,5 +21,119 @@ else:
     sqlalchemy_database_uri = config.settings.DEFAULT_SQLALCHEMY_DATABASE_URI
 
 
-async_engine = create_async_engine(sqlalchemy_database_uri, pool_pre_ping=True)
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """The default async pool, also keeping track of how long checkouts take.
+
+    That is the time from asking for a connection to getting a usable one, so
+    it includes waiting for a free connection, opening new ones and pinging.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        wait = time.perf_counter() - started
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return connection
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            # negative while there are fewer than `size` connections open
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait": self.total_wait / max(self.checkouts, 1),
+            "max_wait": self.max_wait,
+        }
+
+
+engine_options = dict(
+    poolclass=TimedQueuePool,
+    pool_size=config.settings.DATABASE_POOL_SIZE,
+    max_overflow=config.settings.DATABASE_MAX_OVERFLOW,
+    pool_timeout=config.settings.DATABASE_POOL_TIMEOUT,
+    pool_recycle=config.settings.DATABASE_POOL_RECYCLE,
+    pool_pre_ping=config.settings.DATABASE_POOL_PRE_PING,
+    connect_args={
+        "prepared_statement_cache_size": (
+            config.settings.DATABASE_STATEMENT_CACHE_SIZE
+        ),
+    },
+)
+async_engine = create_async_engine(sqlalchemy_database_uri, **engine_options)
 async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+replica_engines = [
+    create_async_engine(uri, **engine_options)
+    for uri in config.settings.DATABASE_REPLICA_URIS
+]
+replica_sessions = [
+    async_sessionmaker(engine, expire_on_commit=False) for engine in replica_engines
+]
+_next_replica = itertools.count()
+
+# users who changed something in the last DATABASE_REPLICA_STICKY_SECONDS
+_recent_writers = LRUCache(
+    max_weight=100_000, ttl=config.settings.DATABASE_REPLICA_STICKY_SECONDS
+)
+
+
+def read_session(
+    user_id: str | None = None, last_write: float | None = None
+) -> AsyncSession:
+    """A session for reading, on the next replica in turn.
+
+    Clients that wrote something in the last DATABASE_REPLICA_STICKY_SECONDS
+    stay on the primary so they see their own changes, as does everyone if
+    there are no replicas. `last_write` is the time the client says it last
+    wrote, see `app.api.middleware`, which works across processes. Clients
+    that don't send it are only kept on the primary by the process that
+    handled their write.
+    """
+    if not replica_sessions:
+        return async_session()
+    sticky = config.settings.DATABASE_REPLICA_STICKY_SECONDS
+    if last_write is not None and time.time() - last_write < sticky:
+        return async_session()
+    if user_id is not None and user_id in _recent_writers:
+        return async_session()
+    return replica_sessions[next(_next_replica) % len(replica_sessions)]()
+
+
+# sessions know their user once `deps.get_current_user` has run with them
+@event.listens_for(Session, "do_orm_execute")
+def _note_statement(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _note_commit(session):
+    user_id = session.info.get("user_id")
+    if session.info.pop("wrote", False) and user_id is not None:
+        _recent_writers.set(user_id, True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_writes(session):
+    session.info.pop("wrote", None)
@@ -1,11 +1,26 @@
 """Main FastAPI app instance declaration."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from app.api.api import api_router
-from app.core import config
+from app.api.middleware import LAST_WRITE_HEADER, LastWriteMiddleware
+from app.core import config, jobs, sca
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # start Lexurgy workers up front so the first request doesn't pay for it
+    if config.settings.LEXURGY_POOL_SIZE > 0:
+        await sca.get_pool()
+    jobs.start_workers()
+    yield
+    await jobs.stop_workers()
+    await sca.close_pool()
+
 
 app = FastAPI(
     title=config.settings.PROJECT_NAME,
@@ -13,6 +28,7 @@ app = FastAPI(
     description=config.settings.DESCRIPTION,
     openapi_url="/openapi.json",
     docs_url="/",
+    lifespan=lifespan,
 )
 app.include_router(api_router)
 
@@ -24,7 +40,10 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[LAST_WRITE_HEADER],
 )
 
+app.add_middleware(LastWriteMiddleware)
+
 # Guards against HTTP Host Header attacks
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=config.settings.ALLOWED_HOSTS)
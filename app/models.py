@@ -15,7 +15,7 @@ alembic upgrade head
 """
 import uuid
 
-from sqlalchemy import Column, ForeignKey, String, Table
+from sqlalchemy import DDL, Column, ForeignKey, Index, String, Table, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -26,6 +26,12 @@ class Base(DeclarativeBase):
     pass
 
 
+# for the trigram indexes used by word search, migrations create it too
+event.listen(
+    Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
+
+
 class AuditTimestamps:
     created_at: Mapped[int] = mapped_column(default=get_now_int)
     updated_at: Mapped[int] = mapped_column(default=get_now_int, onupdate=get_now_int)
@@ -65,7 +71,7 @@ class Language(AuditTimestamps, Base):
     description: Mapped[str | None]
 
     user_id: Mapped[str] = mapped_column(
-        ForeignKey("user_model.id", ondelete="CASCADE")
+        ForeignKey("user_model.id", ondelete="CASCADE"), index=True
     )
 
     user: Mapped["User"] = relationship(back_populates="languages")
@@ -87,7 +93,10 @@ word_link_to_word = Table(
         primary_key=True,
     ),
     Column(
-        "word_id", ForeignKey("word_model.id", ondelete="CASCADE"), primary_key=True
+        "word_id",
+        ForeignKey("word_model.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
     ),
 )
 
@@ -100,7 +109,10 @@ word_class_to_word = Table(
         primary_key=True,
     ),
     Column(
-        "word_id", ForeignKey("word_model.id", ondelete="CASCADE"), primary_key=True
+        "word_id",
+        ForeignKey("word_model.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
     ),
 )
 
@@ -116,6 +128,7 @@ word_class_to_grammar_table = Table(
         "grammar_table_id",
         ForeignKey("grammar_table_model.id", ondelete="CASCADE"),
         primary_key=True,
+        index=True,
     ),
 )
 
@@ -128,7 +141,7 @@ class WordClass(AuditTimestamps, Base):
     part_of_speech: Mapped[str]
 
     language_id: Mapped[int] = mapped_column(
-        ForeignKey("language_model.id", ondelete="CASCADE")
+        ForeignKey("language_model.id", ondelete="CASCADE"), index=True
     )
 
     language: Mapped["Language"] = relationship()
@@ -142,6 +155,14 @@ class WordClass(AuditTimestamps, Base):
 
 class WordLink(AuditTimestamps, Base):
     __tablename__ = "word_link_model"
+    __table_args__ = (
+        Index(
+            "ix_word_link_model_definition_trgm",
+            "definition",
+            postgresql_using="gin",
+            postgresql_ops={"definition": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     definition: Mapped[str]
@@ -155,6 +176,16 @@ class WordLink(AuditTimestamps, Base):
 
 class Word(AuditTimestamps, Base):
     __tablename__ = "word_model"
+    __table_args__ = (
+        # listing a language's words in order, and the language_id foreign key
+        Index("ix_word_model_language_id_word", "language_id", "word", "id"),
+        Index(
+            "ix_word_model_word_trgm",
+            "word",
+            postgresql_using="gin",
+            postgresql_ops={"word": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     word: Mapped[str]
@@ -166,11 +197,13 @@ class Word(AuditTimestamps, Base):
 
     language: Mapped["Language"] = relationship()
 
+    # never loaded implicitly, queries that need them use selectinload, so a
+    # word's links and classes don't multiply each other's rows
     word_links: Mapped[list["WordLink"]] = relationship(
-        secondary=word_link_to_word, back_populates="words", lazy="joined"
+        secondary=word_link_to_word, back_populates="words", lazy="raise"
     )
     word_classes: Mapped[list["WordClass"]] = relationship(
-        secondary=word_class_to_word, back_populates="words", lazy="joined"
+        secondary=word_class_to_word, back_populates="words", lazy="raise"
     )
 
 
@@ -185,7 +218,7 @@ class Phone(Base):
     vowel: Mapped[bool]
 
     language_id: Mapped[int] = mapped_column(
-        ForeignKey("language_model.id", ondelete="CASCADE")
+        ForeignKey("language_model.id", ondelete="CASCADE"), index=True
     )
 
     language: Mapped["Language"] = relationship(back_populates="phones")
@@ -209,7 +242,7 @@ class SoundChangeRules(Base):
     role: Mapped[str | None]
 
     language_id: Mapped[int] = mapped_column(
-        ForeignKey("language_model.id", ondelete="CASCADE")
+        ForeignKey("language_model.id", ondelete="CASCADE"), index=True
     )
 
     language: Mapped["Language"] = relationship(back_populates="sound_change_rules")
@@ -223,7 +256,7 @@ class GrammarTable(Base):
     name: Mapped[str]
     part_of_speech: Mapped[str]
     language_id: Mapped[int] = mapped_column(
-        ForeignKey("language_model.id", ondelete="CASCADE")
+        ForeignKey("language_model.id", ondelete="CASCADE"), index=True
     )
 
     language: Mapped["Language"] = relationship()
@@ -248,7 +281,7 @@ class GrammarTableRow(Base):
     content: Mapped[str]
 
     grammar_table_id: Mapped[int] = mapped_column(
-        ForeignKey("grammar_table_model.id", ondelete="CASCADE")
+        ForeignKey("grammar_table_model.id", ondelete="CASCADE"), index=True
     )
     grammar_table: Mapped["GrammarTable"] = relationship(back_populates="rows")
 
@@ -260,7 +293,7 @@ class GrammarTableColumn(Base):
     content: Mapped[str]
 
     grammar_table_id: Mapped[int] = mapped_column(
-        ForeignKey("grammar_table_model.id", ondelete="CASCADE")
+        ForeignKey("grammar_table_model.id", ondelete="CASCADE"), index=True
     )
     grammar_table: Mapped["GrammarTable"] = relationship(back_populates="columns")
 
@@ -273,16 +306,59 @@ class GrammarTableCell(Base):
     column_categories: Mapped[str]
 
     grammar_table_id: Mapped[int] = mapped_column(
-        ForeignKey("grammar_table_model.id", ondelete="CASCADE")
+        ForeignKey("grammar_table_model.id", ondelete="CASCADE"), index=True
     )
     grammar_table: Mapped["GrammarTable"] = relationship(back_populates="cells")
 
     sound_change_rules_id: Mapped[int] = mapped_column(
-        ForeignKey("sound_change_rules_model.id", ondelete="CASCADE")
+        ForeignKey("sound_change_rules_model.id", ondelete="CASCADE"), index=True
     )
     sound_change_rules: Mapped["SoundChangeRules"] = relationship()
 
 
+class LanguageStats(Base):
+    """Lexicon statistics for a language, see `app.core.lexicon_stats`."""
+
+    __tablename__ = "language_stats_model"
+
+    language_id: Mapped[int] = mapped_column(
+        ForeignKey("language_model.id", ondelete="CASCADE"), primary_key=True
+    )
+    word_count: Mapped[int]
+    words_with_links: Mapped[int]
+    words_with_classes: Mapped[int]
+    # JSON
+    by_part_of_speech: Mapped[str]
+    by_word_class: Mapped[str]
+
+    updated_at: Mapped[int] = mapped_column(default=get_now_int, onupdate=get_now_int)
+
+
+class SCJob(AuditTimestamps, Base):
+    """A long-running sound change job, see `app.core.jobs`."""
+
+    __tablename__ = "sc_job_model"
+
+    id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False), primary_key=True, default=lambda _: str(uuid.uuid4())
+    )
+    kind: Mapped[str]
+    status: Mapped[str] = mapped_column(default="queued", index=True)
+    # JSON
+    payload: Mapped[str]
+    result: Mapped[str | None]
+    error: Mapped[str | None]
+
+    done: Mapped[int] = mapped_column(default=0)
+    total: Mapped[int] = mapped_column(default=0)
+    # refreshed while the job runs, running jobs that stop updating it are requeued
+    heartbeat_at: Mapped[int | None]
+
+    user_id: Mapped[str] = mapped_column(
+        ForeignKey("user_model.id", ondelete="CASCADE"), index=True
+    )
+
+
 ORMType = (
     type[Word]
     | type[WordClass]
@@ -34,6 +34,15 @@ class WordLinkRequest(BaseRequest):
     part_of_speech: str
 
 
+class WordLinkBulkDeleteRequest(BaseRequest):
+    """Delete the word links matching every filter given, `unused` meaning
+    links no word uses."""
+
+    ids: list[int] | None = None
+    part_of_speech: str | None = None
+    unused: bool = False
+
+
 class WordRequest(BaseRequest):
     id: int | None = None
     word: str
@@ -45,6 +54,27 @@ class WordRequest(BaseRequest):
     word_class_ids: list[int] = []
 
 
+class WordBulkDeleteRequest(BaseRequest):
+    """Delete the language's words matching every filter given."""
+
+    language_id: int
+    ids: list[int] | None = None
+    part_of_speech: str | None = None
+    word_class_id: int | None = None
+
+
+class WordImportRow(BaseRequest):
+    """A word in an import, with links and classes given by definition and
+    abbreviation, as they are exported."""
+
+    word: str
+    part_of_speech: str
+    notes: str | None = None
+
+    word_links: list[str] = []
+    word_classes: list[str] = []
+
+
 class PhoneRequest(BaseRequest):
     id: int | None = None
     base_phone: str
@@ -61,6 +91,15 @@ class PhoneRequest(BaseRequest):
         return v
 
 
+class PhoneBulkDeleteRequest(BaseRequest):
+    """Delete the language's phones matching every filter given."""
+
+    language_id: int
+    ids: list[int] | None = None
+    vowel: bool | None = None
+    quality: str | None = None
+
+
 class PhonologyRequest(BaseRequest):
     phonology: list[PhoneRequest]
     mode: Literal["insert", "replace"]
@@ -71,6 +110,11 @@ class SCInput(BaseRequest):
     sound_changes_id: int
 
 
+class ParadigmRequest(BaseRequest):
+    grammar_table_id: int
+    word_list: list[str]
+
+
 class SoundChangeRulesRequest(BaseRequest):
     id: int | None = None
     name: str | None = None
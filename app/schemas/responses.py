@@ -1,6 +1,6 @@
 import json
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, computed_field, field_validator
 from pydantic_core import ValidationError
 
 
@@ -29,6 +29,34 @@ class LanguageResponse(BaseResponse):
     description: str | None
 
 
+class WordClassCount(BaseResponse):
+    id: int
+    name: str
+    abbreviation: str
+    count: int
+
+
+class LanguageStatsResponse(BaseResponse):
+    language_id: int
+    word_count: int
+    words_with_links: int
+    words_with_classes: int
+    by_part_of_speech: dict[str, int]
+    by_word_class: list[WordClassCount]
+    updated_at: int
+
+    @field_validator("by_part_of_speech", "by_word_class", mode="before")
+    @classmethod
+    def convert_json(cls, value):
+        return json.loads(value) if isinstance(value, str) else value
+
+    @computed_field
+    @property
+    def link_coverage(self) -> float:
+        """The share of words with at least one link."""
+        return self.words_with_links / self.word_count if self.word_count else 0.0
+
+
 class WordLinkResponse(BaseResponse):
     id: int
     definition: str
@@ -44,6 +72,10 @@ class WordClassResponse(BaseResponse):
     language_id: int
 
 
+class BulkDeleteResponse(BaseResponse):
+    deleted: list[int]
+
+
 class WordResponse(BaseResponse):
     id: int
     word: str
@@ -67,8 +99,28 @@ class PhoneResponse(BaseResponse):
     composed_phone: str
 
 
+class SCResult(BaseResponse):
+    sound_changes_id: int
+    input: list[str]
+    output: list[str]
+
+
 class SCOutput(BaseResponse):
+    # every evolved form, flattened in input order
     output: list[str]
+    # one entry per SCInput, in the order they were sent
+    results: list[SCResult]
+
+
+class SCJobResponse(BaseResponse):
+    id: str
+    kind: str
+    status: str
+    done: int
+    total: int
+    error: str | None
+    created_at: int
+    updated_at: int
 
 
 class SoundChangeRulesResponse(BaseResponse):
@@ -129,3 +181,29 @@ class GrammarTableFullResponse(GrammarTableMinimalResponse):
     columns: list[GrammarTableCategoryResponse] | None = []
 
     cells: list[GrammarTableCellResponse] | None = []
+
+
+class DatabasePoolStatus(BaseResponse):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    avg_wait: float
+    max_wait: float
+
+
+class PasswordHashingStatus(BaseResponse):
+    workers: int
+    waiting: int
+    in_flight: int
+    submitted: int
+    rejected: int
+    avg_queue_time: float
+    max_queue_time: float
+
+
+class StatusResponse(BaseResponse):
+    database_pool: DatabasePoolStatus
+    password_hashing: PasswordHashingStatus
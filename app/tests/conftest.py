@@ -1,15 +1,17 @@
 import asyncio
 from collections.abc import AsyncGenerator
+from contextlib import contextmanager
 from typing import Any
 
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
-from sqlalchemy import delete, select
+from sqlalchemy import delete, event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core import config, security
-from app.core.session import async_engine, async_session
+from app.api import deps
+from app.core import config, jobs, sca, security
+from app.core.session import _recent_writers, async_engine, async_session
 from app.main import app
 from app.models import (
     Base,
@@ -80,6 +82,47 @@ async def get_or_insert_model(
         return result
 
 
+@contextmanager
+def count_queries():
+    """Count the statements run, and rows they returned, inside the block."""
+    counts = {"queries": 0, "rows": 0}
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        counts["queries"] += 1
+        counts["rows"] += max(cursor.rowcount, 0)
+
+    event.listen(async_engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield counts
+    finally:
+        event.remove(
+            async_engine.sync_engine, "after_cursor_execute", after_cursor_execute
+        )
+
+
+@pytest.fixture
+def fake_lexurgy(tmp_path, monkeypatch):
+    """Install a script, shebang included, in place of Lexurgy.
+
+    The in-process engine is turned off and sound change caches are emptied,
+    so rules actually reach the script.
+    """
+
+    def install(source: str):
+        path = tmp_path / "lexurgy"
+        path.write_text(source)
+        path.chmod(0o755)
+        monkeypatch.setattr(sca, "LEXURGY_PATH", path)
+        return path
+
+    monkeypatch.setattr(config.settings, "SCA_PYTHON_ENGINE", False)
+    sca._rulesets.clear()
+    sca._results.clear()
+    yield install
+    sca._rulesets.clear()
+    sca._results.clear()
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     loop = asyncio.new_event_loop()
@@ -104,10 +147,14 @@ async def session(test_db_setup_sessionmaker) -> AsyncGenerator[AsyncSession, No
     async with async_session() as session:
         yield session
 
+        # job workers started by the test would otherwise keep polling
+        await jobs.stop_workers()
         # delete all data from all tables after test
         for name, table in Base.metadata.tables.items():
             await session.execute(delete(table))
         await session.commit()
+        deps._users.clear()
+        _recent_writers.clear()
 
 
 @pytest_asyncio.fixture(scope="session")
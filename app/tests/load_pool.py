@@ -0,0 +1,220 @@
+"""
+Load test for the database pool settings, run against the app the way it is
+deployed: uvicorn with 2 workers and uvloop.
+
+    python -m app.tests.load_pool [--concurrency 64] [--duration 20]
+
+For each entry in SETTINGS it starts uvicorn on a free port with those
+settings in its environment, registers a throwaway user with a language of
+WORD_COUNT words, has `--concurrency` clients call a mix of read endpoints for
+`--duration` seconds, then prints requests per second, latency percentiles and
+one worker's pool counters from `/status`. The user is deleted afterwards.
+
+It uses whatever database the environment points the app at, and isn't
+collected by pytest.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+from app.tests.shapes import word_request_factory
+
+SETTINGS = [
+    # SQLAlchemy's own defaults, what we used to run with
+    {
+        "DATABASE_POOL_SIZE": 5,
+        "DATABASE_MAX_OVERFLOW": 10,
+        "DATABASE_POOL_PRE_PING": True,
+        "DATABASE_STATEMENT_CACHE_SIZE": 100,
+    },
+    {
+        "DATABASE_POOL_SIZE": 5,
+        "DATABASE_MAX_OVERFLOW": 10,
+        "DATABASE_POOL_PRE_PING": False,
+        "DATABASE_STATEMENT_CACHE_SIZE": 500,
+    },
+    {
+        "DATABASE_POOL_SIZE": 10,
+        "DATABASE_MAX_OVERFLOW": 10,
+        "DATABASE_POOL_PRE_PING": True,
+        "DATABASE_STATEMENT_CACHE_SIZE": 500,
+    },
+    {
+        "DATABASE_POOL_SIZE": 10,
+        "DATABASE_MAX_OVERFLOW": 10,
+        "DATABASE_POOL_PRE_PING": False,
+        "DATABASE_STATEMENT_CACHE_SIZE": 500,
+    },
+    {
+        "DATABASE_POOL_SIZE": 20,
+        "DATABASE_MAX_OVERFLOW": 0,
+        "DATABASE_POOL_PRE_PING": False,
+        "DATABASE_STATEMENT_CACHE_SIZE": 500,
+    },
+]
+WORD_COUNT = 500
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int, settings: dict) -> subprocess.Popen:
+    env = {**os.environ, **{key: str(value) for key, value in settings.items()}}
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            "2",
+            "--loop",
+            "uvloop",
+            "--no-access-log",
+        ],
+        env=env,
+    )
+
+
+async def _wait_until_up(client: httpx.AsyncClient):
+    for _ in range(100):
+        try:
+            await client.get("/openapi.json")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn didn't start")
+
+
+async def _set_up(client: httpx.AsyncClient) -> tuple[dict, int]:
+    username = f"load-{uuid.uuid4()}@example.com"
+    password = str(uuid.uuid4())
+    response = await client.post(
+        "/users/register", json={"username": username, "password": password}
+    )
+    response.raise_for_status()
+    response = await client.post(
+        "/auth/access-token", data={"username": username, "password": password}
+    )
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await client.post(
+        "/languages/", headers=headers, json=[{"name": "load test"}]
+    )
+    response.raise_for_status()
+    language_id = response.json()["id"]
+    response = await client.post(
+        "/words/",
+        headers=headers,
+        json=[
+            word_request_factory(word=f"word{i}", language_id=language_id)
+            for i in range(WORD_COUNT)
+        ],
+    )
+    response.raise_for_status()
+    return headers, language_id
+
+
+async def _hammer(
+    client: httpx.AsyncClient,
+    headers: dict,
+    paths: list[str],
+    deadline: float,
+    latencies: list[float],
+    errors: list[int],
+):
+    i = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(paths[i % len(paths)], headers=headers)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+        i += 1
+
+
+async def _run(base_url: str, settings: dict, concurrency: int, duration: float):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        await _wait_until_up(client)
+        headers, language_id = await _set_up(client)
+        paths = [
+            f"/words/by_language/{language_id}?limit=50",
+            f"/languages/{language_id}/stats",
+            f"/word_classes/by_language/{language_id}",
+            f"/phonology/by_language/{language_id}",
+            "/users/me",
+        ]
+
+        latencies: list[float] = []
+        errors: list[int] = []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(
+            *[
+                _hammer(client, headers, paths, deadline, latencies, errors)
+                for _ in range(concurrency)
+            ]
+        )
+
+        pool = (await client.get("/status/", headers=headers)).json()["database_pool"]
+        await client.delete("/users/me", headers=headers)
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(
+        ", ".join(f"{key.removeprefix('DATABASE_')}={x}" for key, x in settings.items())
+    )
+    print(
+        f"  {len(latencies) / duration:.0f} req/s, {len(errors)} errors, "
+        f"p50 {percentiles[49] * 1000:.1f}ms, p95 {percentiles[94] * 1000:.1f}ms, "
+        f"p99 {percentiles[98] * 1000:.1f}ms"
+    )
+    print(
+        f"  pool: {pool['checkouts']} checkouts, "
+        f"avg wait {pool['avg_wait'] * 1000:.2f}ms, "
+        f"max wait {pool['max_wait'] * 1000:.1f}ms, {pool['timeouts']} timeouts, "
+        f"overflow {pool['overflow']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    args = parser.parse_args()
+
+    for settings in SETTINGS:
+        port = _free_port()
+        server = _start_server(port, settings)
+        try:
+            asyncio.run(
+                _run(
+                    f"http://localhost:{port}",
+                    settings,
+                    args.concurrency,
+                    args.duration,
+                )
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
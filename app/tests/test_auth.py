@@ -1,5 +1,10 @@
+import asyncio
+import threading
+
+import pytest
 from httpx import AsyncClient
 
+from app.core import security
 from app.main import app
 from app.models import User
 from app.tests.conftest import default_user_email, default_user_password
@@ -62,3 +67,62 @@ async def test_auth_refresh_token(client: AsyncClient, default_user: User):
     assert "refresh_token" in token
     assert "refresh_token_expires_at" in token
     assert "refresh_token_issued_at" in token
+
+
+async def test_auth_access_token_busy(
+    client: AsyncClient, default_user: User, monkeypatch
+):
+    pool = security.HashingPool(workers=1, max_queue=0, queue_timeout=1)
+    monkeypatch.setattr(security, "hashing", pool)
+    # the only hashing thread is taken and nobody may wait for it
+    await pool._slots.acquire()
+
+    response = await client.post(
+        app.url_path_for("login_access_token"),
+        data={
+            "username": default_user_email,
+            "password": default_user_password,
+        },
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert pool.stats()["rejected"] == 1
+
+
+async def test_hashing_slot_held_until_cancelled_hash_finishes():
+    pool = security.HashingPool(workers=1, max_queue=1, queue_timeout=1)
+    hashing = threading.Event()
+    finish = threading.Event()
+
+    def slow_hash():
+        hashing.set()
+        finish.wait()
+
+    task = asyncio.create_task(pool.run(slow_hash))
+    await asyncio.to_thread(hashing.wait)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    try:
+        # the thread is still hashing
+        assert pool.stats()["in_flight"] == 1
+        assert pool._slots.locked()
+    finally:
+        finish.set()
+    assert await pool.run(lambda: "next") == "next"
+    assert pool.stats()["in_flight"] == 0
+    assert not pool._slots.locked()
+
+
+async def test_hashing_queue_timeout_keeps_slots():
+    pool = security.HashingPool(workers=1, max_queue=1, queue_timeout=0.05)
+    await pool._slots.acquire()
+
+    with pytest.raises(security.PasswordHashingBusy):
+        await pool.run(lambda: None)
+
+    pool._slots.release()
+    assert await pool.run(lambda: "hashed") == "hashed"
+    assert not pool._slots.locked()
@@ -1,6 +1,19 @@
+import asyncio
+import json
+
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.lexicon_stats import (
+    Contributions,
+    apply_stats_change,
+    refresh_language_stats,
+    word_contributions,
+)
+from app.core.session import async_session
 from app.main import app
+from app.models import Language, LanguageStats, User, Word, WordClass, WordLink
+from app.tests.shapes import base_word_factory, word_request_factory
 
 LANGUAGE_NAME = "test language"
 LANGUAGE_DESCRIPTION = "fake description"
@@ -26,3 +39,93 @@ async def test_get_all_languages(
     )
     languages = response.json()
     assert languages[0]["name"] == default_language.name
+
+
+async def test_get_language_stats(
+    client: AsyncClient,
+    default_user_headers,
+    default_language: Language,
+    default_word_link: WordLink,
+    default_word_class: WordClass,
+):
+    response = await client.post(
+        app.url_path_for("upsert_words"),
+        headers=default_user_headers,
+        json=[
+            word_request_factory(
+                word="one",
+                language_id=default_language.id,
+                word_links=[default_word_link.id],
+                word_classes=[default_word_class.id],
+            ),
+            word_request_factory(
+                word="two", part_of_speech="verb", language_id=default_language.id
+            ),
+        ],
+    )
+    second_word_id = response.json()[1]["id"]
+
+    response = await client.get(
+        app.url_path_for("get_language_stats", language_id=default_language.id),
+        headers=default_user_headers,
+    )
+    stats = response.json()
+    assert stats["word_count"] == 2
+    assert stats["words_with_links"] == 1
+    assert stats["link_coverage"] == 0.5
+    assert stats["by_part_of_speech"] == {"noun": 1, "verb": 1}
+    assert [(x["abbreviation"], x["count"]) for x in stats["by_word_class"]] == [
+        ("dwc", 1)
+    ]
+
+    await client.delete(
+        app.url_path_for("delete_word", word_id=second_word_id),
+        headers=default_user_headers,
+    )
+    response = await client.get(
+        app.url_path_for("get_language_stats", language_id=default_language.id),
+        headers=default_user_headers,
+    )
+    stats = response.json()
+    assert stats["word_count"] == 1
+    assert stats["by_part_of_speech"] == {"noun": 1}
+    assert stats["link_coverage"] == 1.0
+
+
+async def test_concurrent_word_changes_keep_stats_right(
+    session: AsyncSession, default_user: User, default_language: Language
+):
+    await refresh_language_stats(session, default_language.id)
+    await session.commit()
+
+    async def add_word(session: AsyncSession, word: str, part_of_speech: str):
+        new = Word(
+            **base_word_factory(
+                word=word,
+                part_of_speech=part_of_speech,
+                language_id=default_language.id,
+            )
+        )
+        session.add(new)
+        await session.flush()
+        await apply_stats_change(
+            session,
+            Contributions(),
+            await word_contributions(session, Word.id == new.id),
+        )
+
+    async with async_session() as first, async_session() as second:
+        await add_word(first, "one", "noun")
+        # waits for the first transaction, then sees its word in the stats
+        blocked = asyncio.create_task(add_word(second, "two", "verb"))
+        await asyncio.sleep(0.2)
+        assert not blocked.done()
+
+        await first.commit()
+        await blocked
+        await second.commit()
+
+    stats = await session.get(LanguageStats, default_language.id)
+    await session.refresh(stats)
+    assert stats.word_count == 2
+    assert json.loads(stats.by_part_of_speech) == {"noun": 1, "verb": 1}
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import sys
+import threading
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from app.core import config, sca
+from app.core.sca import LexurgyError, LexurgyPool, Ruleset, apply_ruleset
+from app.core.sca_engine import CompiledRules, compile_rules
+from app.main import app
+from app.models import SoundChangeRules
+
+# speaks the `lexurgy server` protocol, upper-casing words, crashing on "crash"
+# and never answering "hang"
+FAKE_SERVER = f"""#!{sys.executable}
+import json, os, sys, time
+
+for line in sys.stdin:
+    words = json.loads(line)["inputWords"]
+    if "crash" in words:
+        os._exit(1)
+    if "hang" in words:
+        time.sleep(60)
+    response = {{"type": "applied", "outputWords": [x.upper() for x in words]}}
+    print(json.dumps(response), flush=True)
+"""
+
+
+# `lexurgy sc` reversing every word, it stays up after writing, like Lexurgy
+FAKE_CLI = f"""#!{sys.executable}
+import os, sys, time
+
+with open(sys.argv[3]) as word_list:
+    words = word_list.read().splitlines()
+time.sleep(0.2)
+with open("input_ev.wli", "w") as out_file:
+    out_file.write("\\n".join(x[::-1] for x in words))
+with open(os.environ["SCRATCH_DIRS"], "a") as scratch_dirs:
+    scratch_dirs.write(os.getcwd() + "\\n")
+print("Wrote the final forms", flush=True)
+time.sleep(60)
+"""
+
+
+async def wait_until_busy(pool: LexurgyPool):
+    while not pool._idle.empty():
+        await asyncio.sleep(0.01)
+
+
+async def test_pool_restarts_crashed_worker(fake_lexurgy):
+    fake_lexurgy(FAKE_SERVER)
+    pool = LexurgyPool(1)
+    await pool.start()
+    try:
+        [worker] = pool._workers
+        crashed = worker.process
+
+        with pytest.raises(LexurgyError):
+            await pool.apply("rules", ["crash"])
+        assert not worker.alive
+
+        assert await pool.apply("rules", ["a", "b"]) == ["A", "B"]
+        assert worker.process.pid != crashed.pid
+    finally:
+        await pool.stop()
+
+
+async def test_pool_cancelled_request_kills_worker(fake_lexurgy):
+    fake_lexurgy(FAKE_SERVER)
+    pool = LexurgyPool(1)
+    await pool.start()
+    try:
+        [worker] = pool._workers
+        process = worker.process
+
+        task = asyncio.create_task(pool.apply("rules", ["hang"]))
+        await wait_until_busy(pool)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert await asyncio.wait_for(process.wait(), timeout=5) is not None
+        assert not worker.alive
+        # the worker is back in the pool and restarted for the next request
+        assert await pool.apply("rules", ["a"]) == ["A"]
+    finally:
+        await pool.stop()
+
+
+async def test_sca_with_all_workers_busy(
+    client: AsyncClient,
+    default_user_headers,
+    default_sound_change_rules: SoundChangeRules,
+    fake_lexurgy,
+    monkeypatch,
+):
+    fake_lexurgy(FAKE_SERVER)
+    monkeypatch.setattr(config.settings, "LEXURGY_POOL_SIZE", 1)
+    monkeypatch.setattr(config.settings, "LEXURGY_POOL_ACQUIRE_TIMEOUT", 0.2)
+    busy = asyncio.create_task(sca.apply_sound_changes("rules", ["hang"]))
+    try:
+        await wait_until_busy(await sca.get_pool())
+
+        response = await client.post(
+            app.url_path_for("sca"),
+            headers=default_user_headers,
+            json=[
+                {
+                    "sound_changes_id": default_sound_change_rules.id,
+                    "word_list": ["test"],
+                }
+            ],
+        )
+        assert response.status_code == 503
+        assert response.json()["detail"] == "All Lexurgy workers are busy"
+    finally:
+        busy.cancel()
+        await asyncio.gather(busy, return_exceptions=True)
+        await sca.close_pool()
+
+
+async def test_cli_runs_concurrently(fake_lexurgy, tmp_path, monkeypatch):
+    fake_lexurgy(FAKE_CLI)
+    scratch_dirs = tmp_path / "scratch_dirs"
+    monkeypatch.setenv("SCRATCH_DIRS", str(scratch_dirs))
+
+    results = await asyncio.gather(
+        sca._apply_with_cli("rules", ["abc", "de"]),
+        sca._apply_with_cli("rules", ["xyz"]),
+    )
+    assert results == [["cba", "ed"], ["zyx"]]
+
+    dirs = scratch_dirs.read_text().splitlines()
+    assert len(set(dirs)) == 2
+    assert not any(os.path.exists(x) for x in dirs)
+
+
+async def test_apply_ruleset_only_evolves_new_words(monkeypatch):
+    calls = []
+
+    async def apply_sound_changes(changes: str, words: list[str]) -> list[str]:
+        calls.append(words)
+        return [x.upper() for x in words]
+
+    monkeypatch.setattr(sca, "apply_sound_changes", apply_sound_changes)
+    ruleset = Ruleset(id=1, content_hash=uuid.uuid4().hex, content="rules")
+
+    assert await apply_ruleset(ruleset, ["b", "a", "b"]) == ["B", "A", "B"]
+    assert calls == [["b", "a"]]
+
+    assert await apply_ruleset(ruleset, ["c", "a", "b", "c"]) == ["C", "A", "B", "C"]
+    assert calls == [["b", "a"], ["c"]]
+
+    assert await apply_ruleset(ruleset, ["a", "c"]) == ["A", "C"]
+    assert calls == [["b", "a"], ["c"]]
+
+    # an edited ruleset starts over
+    edited = Ruleset(id=1, content_hash=uuid.uuid4().hex, content="edited rules")
+    assert await apply_ruleset(edited, ["a"]) == ["A"]
+    assert calls == [["b", "a"], ["c"], ["a"]]
+
+
+async def test_apply_ruleset_evolves_many_words_in_thread(monkeypatch):
+    threads = []
+    apply = CompiledRules.apply
+
+    def spy(self, word: str) -> str:
+        threads.append(threading.current_thread())
+        return apply(self, word)
+
+    monkeypatch.setattr(CompiledRules, "apply", spy)
+    monkeypatch.setattr(config.settings, "SCA_PYTHON_ENGINE_INLINE_WORDS", 2)
+    ruleset = Ruleset(
+        id=1,
+        content_hash=uuid.uuid4().hex,
+        content="raising:\n    a => e",
+        compiled=compile_rules("raising:\n    a => e"),
+    )
+
+    assert await apply_ruleset(ruleset, ["ka", "ta"]) == ["ke", "te"]
+    assert set(threads) == {threading.main_thread()}
+
+    threads.clear()
+    assert await apply_ruleset(ruleset, ["pa", "ba", "da"]) == ["pe", "be", "de"]
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
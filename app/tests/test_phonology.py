@@ -85,3 +85,24 @@ async def test_delete_phone(
         headers=default_user_headers,
     )
     assert response.status_code == 204
+
+
+async def test_bulk_delete_phones(
+    client: AsyncClient,
+    default_user_headers,
+    default_language: Language,
+    default_phone: Phone,
+):
+    response = await client.post(
+        app.url_path_for("bulk_delete_phones"),
+        headers=default_user_headers,
+        json={"language_id": default_language.id, "vowel": False},
+    )
+    assert response.json() == {"deleted": [default_phone.id]}
+
+    response = await client.post(
+        app.url_path_for("bulk_delete_phones"),
+        headers=default_user_headers,
+        json={"language_id": default_language.id},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    GrammarTable,
+    GrammarTableCell,
+    Language,
+    Phone,
+    SoundChangeRules,
+    Word,
+    WordClass,
+    word_class_to_word,
+    word_link_to_word,
+)
+
+LISTING_QUERIES = [
+    (
+        select(Word).where(Word.language_id == 1).order_by(Word.word, Word.id),
+        "ix_word_model_language_id_word",
+    ),
+    (select(Phone).where(Phone.language_id == 1), "ix_phone_model_language_id"),
+    (
+        select(WordClass).where(WordClass.language_id == 1),
+        "ix_word_class_model_language_id",
+    ),
+    (
+        select(SoundChangeRules).where(SoundChangeRules.language_id == 1),
+        "ix_sound_change_rules_model_language_id",
+    ),
+    (
+        select(GrammarTable).where(GrammarTable.language_id == 1),
+        "ix_grammar_table_model_language_id",
+    ),
+    (
+        select(GrammarTableCell).where(GrammarTableCell.grammar_table_id == 1),
+        "ix_grammar_table_cell_model_grammar_table_id",
+    ),
+    (
+        select(Language).where(
+            Language.user_id == "b75365d9-7bf9-4f54-add5-aeab333a087b"
+        ),
+        "ix_language_model_user_id",
+    ),
+    (
+        select(word_link_to_word).where(word_link_to_word.c.word_id == 1),
+        "ix_word_link_to_word_word_id",
+    ),
+    (
+        select(word_class_to_word).where(word_class_to_word.c.word_id == 1),
+        "ix_word_class_to_word_word_id",
+    ),
+]
+
+
+@pytest.mark.parametrize("stmnt,index", LISTING_QUERIES)
+async def test_listing_queries_use_indexes(session: AsyncSession, stmnt, index):
+    # the test tables are tiny, so sequential scans would win without this
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    sql = stmnt.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    plan = "\n".join((await session.scalars(text(f"EXPLAIN {sql}"))).all())
+    await session.rollback()
+
+    assert index in plan
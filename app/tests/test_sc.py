@@ -1,8 +1,20 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core import config, jobs, sca
+from app.core.sca import get_ruleset
+from app.core.sca_engine import CompiledRules
+from app.core.session import async_engine
 from app.main import app
-from app.models import Language, SoundChangeRules, Word
+from app.models import GrammarTable, Language, SCJob, SoundChangeRules, User, Word
 from app.tests.shapes import sound_change_rules_factory
+from app.utils.utils import get_now_int
 
 
 async def test_sca_with_words(
@@ -41,6 +53,172 @@ async def test_sca_with_ids(
     assert content == ["taaaaaaaast"]
 
 
+async def test_sca_with_ids_keeps_order(
+    client: AsyncClient,
+    default_user_headers,
+    default_sound_change_rules: SoundChangeRules,
+    default_word: Word,
+    second_word: Word,
+):
+    response = await client.post(
+        app.url_path_for("sca"),
+        headers=default_user_headers,
+        json=[
+            {
+                "sound_changes_id": default_sound_change_rules.id,
+                "word_list": [str(second_word.id), str(default_word.id)],
+            }
+        ],
+    )
+    assert response.json()["output"] == ["naw word", "taaaaaaaast"]
+
+
+async def test_sca_with_missing_ids(
+    client: AsyncClient,
+    default_user_headers,
+    default_sound_change_rules: SoundChangeRules,
+    default_word: Word,
+):
+    response = await client.post(
+        app.url_path_for("sca"),
+        headers=default_user_headers,
+        json=[
+            {
+                "sound_changes_id": default_sound_change_rules.id,
+                "word_list": [str(default_word.id), "999999"],
+            }
+        ],
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Words not found: 999999"
+
+
+async def test_sca_with_classes_and_environments(
+    client: AsyncClient, default_user_headers, default_language: Language
+):
+    rules = (
+        await client.post(
+            app.url_path_for("upsert_sound_changes"),
+            headers=default_user_headers,
+            json=[
+                sound_change_rules_factory(
+                    content=(
+                        "Class vowel {a, e, i, o, u}\n"
+                        "lenition:\n"
+                        "    {p, t, k} => {b, d, g} / @vowel _ @vowel\n"
+                        "apocope:\n"
+                        "    @vowel => * / _ $\n"
+                        "prothesis:\n"
+                        "    * => e / $ _ s\n"
+                    ),
+                    language_id=default_language.id,
+                )
+            ],
+        )
+    ).json()
+
+    response = await client.post(
+        app.url_path_for("sca"),
+        headers=default_user_headers,
+        json=[
+            {"sound_changes_id": rules[0]["id"], "word_list": ["apata", "spot", "atka"]}
+        ],
+    )
+    assert response.json()["output"] == ["abad", "espot", "atk"]
+
+
+async def test_sca_groups_results_by_input(
+    client: AsyncClient,
+    default_user_headers,
+    default_sound_change_rules: SoundChangeRules,
+    spelling_sound_change_rules: SoundChangeRules,
+):
+    response = await client.post(
+        app.url_path_for("sca"),
+        headers=default_user_headers,
+        json=[
+            {"sound_changes_id": default_sound_change_rules.id, "word_list": ["test"]},
+            {"sound_changes_id": spelling_sound_change_rules.id, "word_list": ["be"]},
+            {"sound_changes_id": default_sound_change_rules.id, "word_list": ["ke"]},
+        ],
+    )
+    content = response.json()
+    assert content["output"] == ["tast", "ba", "ka"]
+    assert [x["output"] for x in content["results"]] == [["tast"], ["ba"], ["ka"]]
+    assert [x["sound_changes_id"] for x in content["results"]] == [
+        default_sound_change_rules.id,
+        spelling_sound_change_rules.id,
+        default_sound_change_rules.id,
+    ]
+
+
+async def test_sca_timeout_kills_lexurgy(
+    client: AsyncClient,
+    default_user_headers,
+    default_sound_change_rules: SoundChangeRules,
+    fake_lexurgy,
+    tmp_path,
+    monkeypatch,
+):
+    pid_file = tmp_path / "pid"
+    fake_lexurgy(f"#!/bin/sh\necho $$ > {pid_file}\nexec sleep 60\n")
+    monkeypatch.setattr(config.settings, "LEXURGY_REQUEST_TIMEOUT", 0.5)
+
+    response = await client.post(
+        app.url_path_for("sca"),
+        headers=default_user_headers,
+        json=[
+            {"sound_changes_id": default_sound_change_rules.id, "word_list": ["test"]}
+        ],
+    )
+    assert response.status_code == 504
+    assert response.json()["detail"] == "Lexurgy timed out"
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
+
+
+async def test_sca_lexurgy_failure(
+    client: AsyncClient,
+    default_user_headers,
+    default_sound_change_rules: SoundChangeRules,
+    fake_lexurgy,
+):
+    fake_lexurgy("#!/bin/sh\necho 'Error: out of memory'\nexit 1\n")
+
+    response = await client.post(
+        app.url_path_for("sca"),
+        headers=default_user_headers,
+        json=[
+            {"sound_changes_id": default_sound_change_rules.id, "word_list": ["test"]}
+        ],
+    )
+    assert response.status_code == 502
+    assert response.json()["detail"] == "Error: out of memory"
+
+
+async def test_sca_stream(
+    client: AsyncClient,
+    default_user_headers,
+    default_sound_change_rules: SoundChangeRules,
+):
+    response = await client.post(
+        app.url_path_for("sca_stream"),
+        headers=default_user_headers,
+        json=[
+            {
+                "sound_changes_id": default_sound_change_rules.id,
+                "word_list": ["test", "be"],
+            }
+        ],
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(x["input"], x["output"]) for x in lines] == [
+        ("test", "tast"),
+        ("be", "ba"),
+    ]
+    assert [(x["done"], x["total"]) for x in lines] == [(1, 2), (2, 2)]
+
+
 async def test_upsert_sound_changes(
     client: AsyncClient, default_user_headers, default_language: Language
 ):
@@ -87,6 +265,255 @@ async def test_upsert_sound_changes_dont_duplicate_spelling(
     assert len(rules) == 1
 
 
+async def wait_for_job(client: AsyncClient, headers, job_id: str) -> dict:
+    for _ in range(100):
+        response = await client.get(
+            app.url_path_for("read_job", job_id=job_id), headers=headers
+        )
+        job = response.json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError("Job didn't finish")
+
+
+async def test_sca_job(
+    client: AsyncClient,
+    default_user_headers,
+    default_sound_change_rules: SoundChangeRules,
+    default_word: Word,
+):
+    response = await client.post(
+        app.url_path_for("submit_sca_job"),
+        headers=default_user_headers,
+        json=[
+            {
+                "sound_changes_id": default_sound_change_rules.id,
+                "word_list": [str(default_word.id)],
+            },
+            {"sound_changes_id": default_sound_change_rules.id, "word_list": ["test"]},
+        ],
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
+
+    job = await wait_for_job(client, default_user_headers, response.json()["id"])
+    assert job["status"] == "done"
+    assert job["done"] == 2
+
+    response = await client.get(
+        app.url_path_for("read_job_result", job_id=job["id"]),
+        headers=default_user_headers,
+    )
+    assert response.json()["output"] == ["taaaaaaaast", "tast"]
+
+
+async def test_requests_are_served_while_job_runs(
+    client: AsyncClient,
+    default_user_headers,
+    default_sound_change_rules: SoundChangeRules,
+    monkeypatch,
+):
+    apply = CompiledRules.apply
+
+    def slow_apply(self, word: str) -> str:
+        time.sleep(0.02)
+        return apply(self, word)
+
+    monkeypatch.setattr(CompiledRules, "apply", slow_apply)
+    # more than SCA_PYTHON_ENGINE_INLINE_WORDS, like any lexicon-sized job
+    words = [f"slow{i}" for i in range(60)]
+    response = await client.post(
+        app.url_path_for("submit_sca_job"),
+        headers=default_user_headers,
+        json=[{"sound_changes_id": default_sound_change_rules.id, "word_list": words}],
+    )
+
+    latencies = []
+    while True:
+        started = time.perf_counter()
+        job = (
+            await client.get(
+                app.url_path_for("read_job", job_id=response.json()["id"]),
+                headers=default_user_headers,
+            )
+        ).json()
+        latencies.append(time.perf_counter() - started)
+        if job["status"] not in ("queued", "running"):
+            break
+        await asyncio.sleep(0.05)
+
+    assert job["status"] == "done"
+    # the job takes over a second, none of that is spent blocking the loop
+    assert max(latencies) < 0.5
+
+
+async def test_paradigm_job(
+    client: AsyncClient,
+    default_user_headers,
+    default_grammar_table: GrammarTable,
+):
+    response = await client.post(
+        app.url_path_for("submit_paradigm_job"),
+        headers=default_user_headers,
+        json={"grammar_table_id": default_grammar_table.id, "word_list": ["test"]},
+    )
+    job = await wait_for_job(client, default_user_headers, response.json()["id"])
+    assert job["status"] == "done"
+
+    response = await client.get(
+        app.url_path_for("stream_job", job_id=job["id"]),
+        headers=default_user_headers,
+    )
+    lines = [json.loads(x) for x in response.text.splitlines()]
+    assert lines == [{"status": "done", "done": 1, "total": 1, "error": None}]
+
+    response = await client.get(
+        app.url_path_for("read_job_result", job_id=job["id"]),
+        headers=default_user_headers,
+    )
+    [cell] = response.json()["cells"]
+    assert cell["row_categories"] == ["test"]
+    assert cell["output"] == ["tast"]
+
+
+async def test_job_with_expired_lease_is_requeued(
+    session: AsyncSession, default_user: User
+):
+    expired = get_now_int() - config.settings.SCA_JOB_LEASE_SECONDS - 1
+    job = SCJob(
+        kind="apply",
+        payload="[]",
+        status="running",
+        done=3,
+        heartbeat_at=expired,
+        user_id=default_user.id,
+    )
+    session.add(job)
+    await session.commit()
+
+    assert await jobs._claim_job() == job.id
+    await session.refresh(job)
+    assert job.status == "running"
+    assert job.done == 0
+    assert job.heartbeat_at > expired
+
+
+async def test_concurrent_claims_respect_running_limit(
+    session: AsyncSession, default_user: User, monkeypatch
+):
+    monkeypatch.setattr(config.settings, "SCA_JOB_MAX_RUNNING_PER_USER", 1)
+
+    class SlowCommitSession(AsyncSession):
+        async def commit(self):
+            # keep every claim's transaction open until they all overlap
+            await asyncio.sleep(0.1)
+            await super().commit()
+
+    monkeypatch.setattr(
+        jobs,
+        "async_session",
+        async_sessionmaker(async_engine, class_=SlowCommitSession),
+    )
+    session.add_all(
+        [SCJob(kind="apply", payload="[]", user_id=default_user.id) for _ in range(4)]
+    )
+    await session.commit()
+
+    claimed = await asyncio.gather(*[jobs._claim_job() for _ in range(4)])
+    assert len([x for x in claimed if x is not None]) == 1
+
+
+async def test_cancelled_job_is_requeued(
+    session: AsyncSession, default_user: User, monkeypatch
+):
+    started = asyncio.Event()
+
+    async def run_forever(session, job, report):
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setitem(jobs.RUNNERS, "apply", run_forever)
+    job = SCJob(kind="apply", payload="[]", user_id=default_user.id)
+    session.add(job)
+    await session.commit()
+
+    assert await jobs._claim_job() == job.id
+    task = asyncio.create_task(jobs._run_job(job.id))
+    await started.wait()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    await session.refresh(job)
+    assert job.status == "queued"
+    assert job.heartbeat_at is None
+
+
+async def test_read_missing_job(client: AsyncClient, default_user_headers):
+    response = await client.get(
+        app.url_path_for("read_job", job_id="00000000-0000-0000-0000-000000000000"),
+        headers=default_user_headers,
+    )
+    assert response.status_code == 404
+
+
+async def test_upsert_sound_changes_invalidates_cached_ruleset(
+    client: AsyncClient,
+    session: AsyncSession,
+    default_user_headers,
+    default_language: Language,
+    default_sound_change_rules: SoundChangeRules,
+):
+    cached = await get_ruleset(session, default_sound_change_rules.id)
+    assert (cached.id, cached.content_hash) in sca._rulesets
+
+    await client.post(
+        app.url_path_for("upsert_sound_changes"),
+        headers=default_user_headers,
+        json=[
+            sound_change_rules_factory(
+                id=default_sound_change_rules.id,
+                content="new-rule:\nunchanged",
+                language_id=default_language.id,
+            )
+        ],
+    )
+
+    assert (cached.id, cached.content_hash) not in sca._rulesets
+
+    updated = await get_ruleset(session, default_sound_change_rules.id)
+    assert updated.content == "new-rule:\nunchanged"
+    assert updated.content_hash != cached.content_hash
+
+
+async def test_unsupported_ruleset_goes_to_lexurgy(
+    session: AsyncSession,
+    default_user: User,
+    default_language: Language,
+    monkeypatch,
+):
+    calls = []
+
+    async def apply_sound_changes(changes: str, words: list[str]) -> list[str]:
+        calls.append(words)
+        return words
+
+    monkeypatch.setattr(sca, "apply_sound_changes", apply_sound_changes)
+    rules = SoundChangeRules(
+        **sound_change_rules_factory(
+            content="voicing:\n    t => d\nthen:\n    d => z",
+            language_id=default_language.id,
+        )
+    )
+    session.add(rules)
+    await session.commit()
+
+    ruleset = await get_ruleset(session, rules.id)
+    assert ruleset.compiled is None
+    assert await sca.apply_ruleset(ruleset, ["tata"]) == ["tata"]
+    assert calls == [["tata"]]
+
+
 async def test_get_sc_with_role(
     client: AsyncClient,
     default_user_headers,
@@ -0,0 +1,46 @@
+import pytest
+
+from app.core.sca_engine import UnsupportedSyntax, compile_rules
+
+UNSUPPORTED = [
+    # features
+    "Feature type(*cons, vowel)\nvoicing:\n    t => d",
+    "voicing:\n    [-voice] => [+voice] / _ a",
+    # syllables
+    "Syllables:\n    @cons? @vowel\nvoicing:\n    t => d",
+    # sequential blocks
+    "voicing:\n    t => d\nthen:\n    d => z",
+    # exclusions
+    "voicing:\n    t => d / a _ // _ a",
+    # optional segments
+    "voicing:\n    t => d / a? _",
+]
+
+
+@pytest.mark.parametrize("content", UNSUPPORTED)
+def test_compile_unsupported_syntax(content: str):
+    with pytest.raises(UnsupportedSyntax):
+        compile_rules(content)
+
+
+def test_insertion_at_word_boundaries():
+    rules = compile_rules(
+        "prothesis:\n    * => e / $ _ s\nparagoge:\n    * => a / t _ $"
+    )
+    assert [rules.apply(x) for x in ["spo", "tspo", "pat", "tap"]] == [
+        "espo",
+        "tspo",
+        "pata",
+        "tap",
+    ]
+
+
+def test_deletion_at_word_boundaries():
+    rules = compile_rules("aphaeresis:\n    h => * / $ _\napocope:\n    e => * / _ $")
+    assert [rules.apply(x) for x in ["hohe", "ehhe"]] == ["oh", "ehh"]
+
+
+def test_environments_see_word_before_rule():
+    # checked against the output so far, the last "a" would follow an "o"
+    rules = compile_rules("dissimilation:\n    a => o / a _")
+    assert rules.apply("aaa") == "aoo"
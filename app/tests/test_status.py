@@ -0,0 +1,19 @@
+from httpx import AsyncClient
+
+from app.main import app
+
+
+async def test_read_status(client: AsyncClient, default_user_headers):
+    response = await client.get(
+        app.url_path_for("read_status"), headers=default_user_headers
+    )
+    assert response.status_code == 200
+    status = response.json()
+    assert status["database_pool"]["checkouts"] > 0
+    assert status["database_pool"]["checked_out"] >= 0
+    assert status["password_hashing"]["rejected"] == 0
+
+
+async def test_read_status_needs_token(client: AsyncClient):
+    response = await client.get(app.url_path_for("read_status"))
+    assert response.status_code == 401
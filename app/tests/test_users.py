@@ -2,9 +2,12 @@ from httpx import AsyncClient
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api import deps
 from app.main import app
 from app.models import User
 from app.tests.conftest import (
+    count_queries,
+    default_user_access_token,
     default_user_email,
     default_user_id,
     default_user_password_hash,
@@ -22,6 +25,18 @@ async def test_read_current_user(client: AsyncClient, default_user_headers):
     }
 
 
+async def test_read_current_user_is_cached(client: AsyncClient, default_user_headers):
+    await client.get(
+        app.url_path_for("read_current_user"), headers=default_user_headers
+    )
+    with count_queries() as counts:
+        response = await client.get(
+            app.url_path_for("read_current_user"), headers=default_user_headers
+        )
+    assert response.status_code == 200
+    assert counts["queries"] == 0
+
+
 async def test_delete_current_user(
     client: AsyncClient, default_user_headers, session: AsyncSession
 ):
@@ -33,6 +48,11 @@ async def test_delete_current_user(
     user = result.scalars().first()
     assert user is None
 
+    response = await client.get(
+        app.url_path_for("read_current_user"), headers=default_user_headers
+    )
+    assert response.status_code == 404
+
 
 async def test_reset_current_user_password(
     client: AsyncClient, default_user_headers, session: AsyncSession
@@ -66,3 +86,18 @@ async def test_register_new_user(
     )
     user = result.scalars().first()
     assert user is not None
+
+
+async def test_reset_current_user_password_invalidates_cached_user(
+    client: AsyncClient, default_user_headers, session: AsyncSession
+):
+    # caches the user with the old password hash
+    await client.get(
+        app.url_path_for("read_current_user"), headers=default_user_headers
+    )
+    await client.post(
+        app.url_path_for("reset_current_user_password"),
+        headers=default_user_headers,
+        json={"password": "testxxxxxx"},
+    )
+    assert deps._users.get((default_user_id, default_user_access_token)) is None
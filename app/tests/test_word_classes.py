@@ -1,8 +1,11 @@
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.main import app
-from app.models import Language, WordClass
+from app.models import Language, User, WordClass
+from app.tests.conftest import count_queries
 from app.tests.shapes import prune_fields, word_class_factory
+from app.utils.db_utils import verify_language_ownership, verify_ownership
 
 
 async def test_upsert_word_classes(
@@ -74,3 +77,50 @@ async def test_upsert_word_classes_with_delete(
     )
     json = get_response.json()
     assert len(json) == 1
+
+
+async def test_upsert_word_classes_into_someone_elses_language(
+    client: AsyncClient, default_user_headers, session: AsyncSession
+):
+    other_user = User(username="yennefer@vengerberg.pl", hashed_password="x")
+    other_language = Language(name="other language", user=other_user)
+    session.add(other_language)
+    await session.commit()
+
+    response = await client.post(
+        app.url_path_for("upsert_word_classes"),
+        headers=default_user_headers,
+        json=[word_class_factory(language_id=other_language.id)],
+    )
+    assert response.status_code == 401
+
+
+async def test_verify_ownership_remembers_languages(
+    session: AsyncSession,
+    default_user: User,
+    default_language: Language,
+    default_word_class: WordClass,
+):
+    with count_queries() as counts:
+        language_ids = await verify_ownership(
+            session,
+            current_user=default_user,
+            schema=WordClass,
+            target_ids=[default_word_class.id],
+        )
+    assert language_ids == {default_language.id}
+    assert counts["queries"] == 1
+
+    # the language was seen by the first check
+    with count_queries() as counts:
+        await verify_ownership(
+            session,
+            current_user=default_user,
+            schema=WordClass,
+            target_ids=[],
+            language_ids=[default_language.id],
+        )
+        await verify_language_ownership(
+            session, current_user=default_user, language_id=default_language.id
+        )
+    assert counts["queries"] == 0
@@ -1,7 +1,9 @@
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.main import app
-from app.tests.shapes import word_link_factory
+from app.models import Language, User, Word, WordLink
+from app.tests.shapes import base_word_factory, word_link_factory
 
 WORD_LINK_WORD = "test"
 
@@ -37,3 +39,47 @@ async def test_delete_word_link(
         headers=default_user_headers,
     )
     assert response.status_code == 204
+
+
+async def test_bulk_delete_unused_word_links(
+    client: AsyncClient, default_user_headers, default_word, secondary_word_link
+):
+    response = await client.post(
+        app.url_path_for("bulk_delete_word_links"),
+        headers=default_user_headers,
+        json={"unused": True},
+    )
+    assert response.json() == {"deleted": [secondary_word_link.id]}
+
+
+async def test_bulk_delete_leaves_other_users_word_links(
+    client: AsyncClient,
+    default_user_headers,
+    default_word,
+    default_word_link,
+    secondary_word_link,
+    session: AsyncSession,
+):
+    other_language = Language(
+        name="other language",
+        user=User(username="yennefer@vengerberg.pl", hashed_password="x"),
+    )
+    other_word = Word(**base_word_factory(word="other"), language=other_language)
+    other_word.word_links.append(secondary_word_link)
+    session.add(other_word)
+    await session.commit()
+
+    response = await client.post(
+        app.url_path_for("bulk_delete_word_links"),
+        headers=default_user_headers,
+        json={"part_of_speech": default_word_link.part_of_speech},
+    )
+    assert response.json() == {"deleted": [default_word_link.id]}
+
+    response = await client.post(
+        app.url_path_for("bulk_delete_word_links"),
+        headers=default_user_headers,
+        json={"ids": [secondary_word_link.id]},
+    )
+    assert response.status_code == 401
+    assert await session.get(WordLink, secondary_word_link.id) is not None
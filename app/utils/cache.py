@@ -0,0 +1,77 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class LRUCache:
+    """In-process least-recently-used cache.
+
+    Every entry has a weight, 1 unless `weigher` says otherwise, and the least
+    recently used entries are evicted once the total goes over `max_weight`.
+    With `ttl`, entries also expire that many seconds after they were set.
+    Not thread-safe, it is meant to be used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        max_weight: int,
+        weigher: Callable[[Any], int] | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        self.max_weight = max_weight
+        self.weigher = weigher or (lambda _: 1)
+        self.ttl = ttl
+        self.weight = 0
+        # key -> (value, weight, expires at)
+        self._entries: OrderedDict[
+            Hashable, tuple[Any, int, float | None]
+        ] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._live_entry(key) is not None
+
+    def _live_entry(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+            self.pop(key)
+            return None
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._live_entry(key)
+        if entry is None:
+            return default
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.pop(key)
+        weight = self.weigher(value)
+        if weight > self.max_weight:
+            return
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        self._entries[key] = (value, weight, expires_at)
+        self.weight += weight
+        while self.weight > self.max_weight:
+            _, (_, evicted_weight, _) = self._entries.popitem(last=False)
+            self.weight -= evicted_weight
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self.weight -= entry[1]
+        return entry[0]
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose key matches `predicate`."""
+        for key in [key for key in self._entries if predicate(key)]:
+            self.pop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.weight = 0
@@ -1,25 +1,71 @@
+from collections.abc import Iterable
+
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
-from app.models import Base, User
+from app.models import Base, Language, User
+
+
+def _language_owners(session: AsyncSession) -> dict[int, str]:
+    """Language id -> owner id, for languages already looked up with this session.
+
+    Sessions are per request, so this is forgotten when the request ends.
+    """
+    return session.info.setdefault("language_owners", {})
 
 
 async def verify_ownership(
-    session: AsyncSession, *, current_user: User, schema: Base, target_ids: list[int]
-):
-    result = (
-        (
-            await session.scalars(
-                select(schema)
-                .where(schema.id.in_(target_ids))
-                .options(joinedload(schema.language))
+    session: AsyncSession,
+    *,
+    current_user: User,
+    schema: Base,
+    target_ids: Iterable[int],
+    language_ids: Iterable[int] = (),
+) -> set[int]:
+    """Raise a 401 unless the user owns the languages of all the `schema` rows
+    in `target_ids`, and all of `language_ids`. Ids that don't exist are
+    ignored, unknown languages are not.
+
+    Only id columns are read, in one query, and languages seen earlier in the
+    request aren't looked up again. Returns the ids of all those languages.
+    """
+    owners = _language_owners(session)
+    target_ids = set(target_ids)
+    language_ids = set(language_ids)
+    unknown_ids = language_ids - owners.keys()
+
+    if target_ids or unknown_ids:
+        result = await session.execute(
+            select(Language.id, Language.user_id).where(
+                or_(
+                    Language.id.in_(
+                        select(schema.language_id).where(schema.id.in_(target_ids))
+                    ),
+                    Language.id.in_(unknown_ids),
+                )
             )
         )
-        .unique()
-        .all()
-    )
-    bad_items = [x for x in result if x.language.user_id != current_user.id]
-    if len(bad_items) > 0:
+        found = dict(result.tuples().all())
+        owners.update(found)
+        language_ids.update(found)
+
+    if any(owners.get(x) != current_user.id for x in language_ids):
+        raise HTTPException(401)
+    return language_ids
+
+
+async def verify_language_ownership(
+    session: AsyncSession, *, current_user: User, language_id: int
+):
+    """Raise a 404 if the language doesn't exist and a 401 if it isn't the user's."""
+    owners = _language_owners(session)
+    if language_id not in owners:
+        owner = await session.scalar(
+            select(Language.user_id).where(Language.id == language_id)
+        )
+        if owner is None:
+            raise HTTPException(404, detail="Language not found")
+        owners[language_id] = owner
+    if owners[language_id] != current_user.id:
         raise HTTPException(401)